@@ -0,0 +1,110 @@
+import json, logging, threading
+from flask import Flask, Response, jsonify, request, stream_with_context
+from config import Config
+from pipeline import Pipeline, doc_info
+import metrics
+
+logger = logging.getLogger(__name__)
+
+class Service:
+    """
+    서버 전체에서 공유하는 파이프라인 구성요소
+    시작 시 한 번 생성하고, 모델 로드가 끝나면 ready
+    """
+    def __init__(self):
+        self.pipeline = None
+        self.ready = threading.Event()
+        self.error = None
+
+    def warm(self):
+        try:
+            pipeline = Pipeline()
+            processor = pipeline.processor
+            if processor.use_embed:
+                processor.embed(['warmup'])
+            if pipeline.downloader.parser:
+                pipeline.downloader.parser.executor()
+
+            self.pipeline = pipeline
+            self.ready.set()
+            logger.info("서비스 준비 완료")
+        except Exception as e:
+            self.error = str(e)
+            logger.error(f"서비스 초기화 실패: {e}")
+
+    def start(self):
+        threading.Thread(target=self.warm, name='warmup', daemon=True).start()
+
+def create_app(service: Service = None) -> Flask:
+    app = Flask(__name__)
+    service = service or Service()
+    if not service.ready.is_set():
+        service.start()
+    app.config['service'] = service
+
+    def parse_request():
+        data = request.get_json(silent=True) or {}
+        question = (data.get('question') or '').strip()
+        top_k = int(data.get('top_k') or 5)
+        return question, max(1, min(top_k, 10))
+
+    @app.get('/healthz')
+    def healthz():
+        return jsonify({'status': 'ok'})
+
+    @app.get('/readyz')
+    def readyz():
+        if service.ready.is_set():
+            return jsonify({'status': 'ready'})
+        return jsonify({'status': 'error' if service.error else 'warming', 'error': service.error}), 503
+
+    @app.get('/metrics')
+    def metrics_text():
+        return Response(metrics.prometheus(), mimetype='text/plain; version=0.0.4')
+
+    @app.post('/query')
+    def query():
+        if not service.ready.is_set():
+            return jsonify({'error': '서비스 준비 중입니다.'}), 503
+        question, top_k = parse_request()
+        if not question:
+            return jsonify({'error': 'question이 필요합니다.'}), 400
+
+        res = service.pipeline.run(question, top_k)
+        body = {
+            'question': question,
+            'answer': res['answer'],
+            'sources': res['sources'],
+            'documents': [doc_info(p) for p in res['papers']],
+            'analysis': res['analysis'],
+            'search': res['search'],
+            'timings': res['timings'],
+        }
+        if 'trace' in res:
+            body['trace'] = res['trace']
+        return jsonify(body)
+
+    @app.post('/query/stream')
+    def query_stream():
+        if not service.ready.is_set():
+            return jsonify({'error': '서비스 준비 중입니다.'}), 503
+        question, top_k = parse_request()
+        if not question:
+            return jsonify({'error': 'question이 필요합니다.'}), 400
+
+        def events():
+            try:
+                for event in service.pipeline.stream(question, top_k):
+                    yield f"event: {event['type']}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+            except Exception as e:
+                logger.error(f"스트리밍 처리 오류: {e}")
+                yield f"event: error\ndata: {json.dumps({'type': 'error', 'message': str(e)}, ensure_ascii=False)}\n\n"
+
+        return Response(stream_with_context(events()), mimetype='text/event-stream',
+                        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+    return app
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    create_app().run(host=Config.SERVER_HOST, port=Config.SERVER_PORT, threaded=True)
@@ -0,0 +1,213 @@
+"""
+여러 질문 일괄 실행 (야간 리포트용)
+1) 모든 질문 분석 -> 2) 검색 구문 합집합으로 검색, 문헌 전체 중복 제거
+-> 3) 고유 문헌마다 한 번만 다운로드 / 파싱 -> 4) 질문별 재순위 -> 5) LLM 호출 (동시 실행 수 제한)
+
+사용법: python batch.py questions.jsonl results.jsonl [--top-k 5]
+입력 한 줄: {"question": "...", "id": "...", "top_k": 5} 또는 "질문 문자열"
+출력 한 줄: 완료 순서대로 {"index", "id", "question", "answer", "sources", "documents", "query"}
+"""
+import json, time, logging, argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Optional, TextIO
+from config import Config
+from pipeline import Pipeline, doc_info
+from context_compressor import compress
+from search.dedup import dedup
+from search.result_cache import ResultCache
+import metrics
+
+logger = logging.getLogger(__name__)
+
+def read_questions(path: str) -> List[Dict]:
+    items = []
+    with open(path, encoding='utf-8') as f:
+        for n, line in enumerate(f, 1):
+            line = line.strip()
+            if not line: continue
+            try:
+                item = json.loads(line)
+            except json.JSONDecodeError as e:
+                logger.warning(f"{path}:{n} JSON 파싱 실패, 건너뜀: {e}")
+                continue
+            if isinstance(item, str):
+                item = {'question': item}
+            if not (item.get('question') or '').strip():
+                logger.warning(f"{path}:{n} question 없음, 건너뜀")
+                continue
+            items.append(item)
+    return items
+
+def paper_keys(p: Dict) -> List[str]:
+    """병합 전 레코드 키 (dedup이 남긴 'duplicates'와 같은 형식)"""
+    return [f"{p.get('source', '')}:{p.get('id', '')}"] + list(p.get('duplicates') or [])
+
+class BatchRunner:
+    def __init__(self, pipeline: Pipeline = None, llm_concurrency: int = None):
+        self.pipeline = pipeline or Pipeline()
+        self.llm_concurrency = llm_concurrency or Config.BATCH_LLM_CONCURRENCY
+
+    def run(self, items: List[Dict], out: TextIO, top_k: int = 5) -> Dict:
+        """질문 목록을 단계별로 처리하고 결과를 out에 JSONL로 기록, 통계 반환"""
+        start = time.perf_counter()
+        stats = {'questions': len(items), 'timings': {}}
+        if not items:
+            return dict(stats, questions_per_minute=0.0)
+
+        def phase(name: str, t: float):
+            stats['timings'][name] = round(time.perf_counter() - t, 3)
+            logger.info(f"[batch] {name} 완료 ({stats['timings'][name]}s)")
+
+        with metrics.trace('batch') as tr:
+            t = time.perf_counter()
+            with metrics.span('batch.analyze', questions=len(items)):
+                analyses = self.analyze_all([it['question'] for it in items])
+            phase('analyze', t)
+
+            t = time.perf_counter()
+            with metrics.span('batch.search'):
+                papers, per_question, n_queries = self.search_all(analyses)
+            stats.update(queries=n_queries, papers=len(papers))
+            phase('search', t)
+
+            t = time.perf_counter()
+            with metrics.span('batch.download', papers=len(papers)):
+                downloaded = self.download_all(papers)
+            stats['downloaded'] = sum(p is not None for p in downloaded)
+            phase('download', t)
+
+            t = time.perf_counter()
+            with metrics.span('batch.rank'):
+                ranked = self.rank_all(items, analyses, per_question, downloaded, top_k)
+            phase('rank', t)
+
+            t = time.perf_counter()
+            with metrics.span('batch.llm'):
+                stats['answered'] = self.answer_all(items, analyses, ranked, out)
+            phase('llm', t)
+
+        elapsed = time.perf_counter() - start
+        stats['elapsed'] = round(elapsed, 3)
+        stats['questions_per_minute'] = round(len(items) / elapsed * 60, 2)
+        if tr is not None:
+            stats['trace'] = tr.to_dict()
+        return stats
+
+    def analyze_all(self, questions: List[str]) -> List[Dict]:
+        """1) 질문 분석 (Intent 메모 / 영구 캐시 공유)"""
+        intent = self.pipeline.intent
+        with ThreadPoolExecutor(max_workers=Config.BATCH_ANALYZE_WORKERS, thread_name_prefix='batch-analyze') as pool:
+            return list(pool.map(intent.analyze, questions))
+
+    def search_all(self, analyses: List[Dict]):
+        """
+        2) 정규화한 검색 구문별로 한 번만 검색한 뒤 전체 결과를 한꺼번에 중복 제거
+        반환: (고유 문헌, 질문별 고유 문헌 인덱스 목록, 검색 구문 수)
+        """
+        search = self.pipeline.search
+        queries: Dict[str, Dict] = {}
+        for a in analyses:
+            queries.setdefault(ResultCache.normalize(a['query'] or ' '.join(a['keywords'])), a)
+
+        found: Dict[str, List[Dict]] = {}
+        with ThreadPoolExecutor(max_workers=Config.BATCH_SEARCH_WORKERS, thread_name_prefix='batch-search') as pool:
+            futures = {metrics.submit(pool, search.search_all_status, a['keywords'], None, a['query']): q
+                       for q, a in queries.items()}
+            for f in as_completed(futures):
+                q = futures[f]
+                try:
+                    found[q] = f.result()['papers']
+                except Exception as e:
+                    logger.error(f"'{q}' 검색 실패: {e}")
+                    found[q] = []
+
+        papers = dedup([p for ps in found.values() for p in ps])
+        where = {k: i for i, p in enumerate(papers) for k in paper_keys(p)}
+
+        per_question = []
+        for a in analyses:
+            q = ResultCache.normalize(a['query'] or ' '.join(a['keywords']))
+            idx = []
+            for p in found.get(q, []):
+                i = next((where[k] for k in paper_keys(p) if k in where), None)
+                if i is not None and i not in idx:
+                    idx.append(i)
+            per_question.append(idx)
+
+        logger.info(f"[batch] 검색 구문 {len(queries)}개, 고유 문헌 {len(papers)}개")
+        return papers, per_question, len(queries)
+
+    def download_all(self, papers: List[Dict]) -> List[Optional[Dict]]:
+        """3) 고유 문헌마다 한 번만 다운로드 / 파싱하고 누적 인덱스 / 임베딩에 한 번에 반영"""
+        downloaded = self.pipeline.downloader.d_and_p_many(papers)
+        ok = [p for p in downloaded if p is not None]
+        if ok:
+            self.pipeline.processor.fork().process_doc(ok)
+        return downloaded
+
+    def rank_all(self, items: List[Dict], analyses: List[Dict], per_question: List[List[int]],
+                 downloaded: List[Optional[Dict]], top_k: int) -> List[List[Dict]]:
+        """4) 질문별 재순위 (문헌은 얕은 복사로 질문마다 점수 / 발췌를 따로 가짐)"""
+        ranked = []
+        for it, a, idx in zip(items, analyses, per_question):
+            docs = [downloaded[i].copy() for i in idx if downloaded[i] is not None]
+            if not docs:
+                ranked.append([])
+                continue
+            processor = self.pipeline.processor.fork()
+            processor.process_doc(docs, save=False)
+            rank_q = f"{it['question']} {a['query']}"
+            relevant = processor.rel_doc(rank_q, top_k=int(it.get('top_k') or top_k))
+            if Config.USE_COMPRESSION:
+                compress(rank_q, relevant)
+            ranked.append(relevant)
+        return ranked
+
+    def answer_all(self, items: List[Dict], analyses: List[Dict], ranked: List[List[Dict]], out: TextIO) -> int:
+        """5) LLM 호출 (동시 실행 수 제한), 완료되는 대로 기록"""
+        llm = self.pipeline.llm
+        answered = 0
+        with ThreadPoolExecutor(max_workers=self.llm_concurrency, thread_name_prefix='batch-llm') as pool:
+            futures = {metrics.submit(pool, llm.gen_res, it['question'], docs): i
+                       for i, (it, docs) in enumerate(zip(items, ranked))}
+            for f in as_completed(futures):
+                i = futures[f]
+                it = items[i]
+                try:
+                    res = f.result()
+                    answered += 1
+                except Exception as e:
+                    logger.error(f"{i}번 질문 답변 생성 실패: {e}")
+                    res = {'answer': None, 'sources': [], 'error': str(e)}
+
+                row = {
+                    'index': i,
+                    'id': it.get('id', i),
+                    'question': it['question'],
+                    'query': analyses[i]['query'],
+                    'answer': res['answer'],
+                    'sources': res['sources'],
+                    'documents': [doc_info(p) for p in ranked[i]],
+                }
+                if 'error' in res:
+                    row['error'] = res['error']
+                out.write(json.dumps(row, ensure_ascii=False) + '\n')
+                out.flush()
+        return answered
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description='여러 질문 일괄 실행 (JSONL -> JSONL)')
+    parser.add_argument('input')
+    parser.add_argument('output')
+    parser.add_argument('--top-k', type=int, default=5)
+    parser.add_argument('--llm-concurrency', type=int, default=None)
+    args = parser.parse_args()
+
+    items = read_questions(args.input)
+    with open(args.output, 'w', encoding='utf-8') as out:
+        stats = BatchRunner(llm_concurrency=args.llm_concurrency).run(items, out, args.top_k)
+    stats.pop('trace', None)
+
+    print(f"\n질문 {stats['questions']}개 / {stats.get('elapsed', 0)}s -> {stats['questions_per_minute']} questions/min")
+    print(json.dumps(stats, ensure_ascii=False, indent=2))
@@ -0,0 +1,169 @@
+"""
+텍스트 처리 / 검색 핫패스 마이크로 벤치마크 (외부 API 호출 없음)
+합성 코퍼스 크기별로 함수마다 실행 시간(중앙값)과 최대 메모리(tracemalloc) 측정,
+저장된 기준값보다 느려지면 회귀로 표시하고 종료 코드 1 반환
+
+사용법:
+  python benchmarks/bench_hotpaths.py --sizes 100 1000
+  python benchmarks/bench_hotpaths.py --sizes 100 1000 10000 100000 --repeat 3
+  python benchmarks/bench_hotpaths.py --only rel_doc process_doc
+  python benchmarks/bench_hotpaths.py --save benchmarks/baseline.json
+  python benchmarks/bench_hotpaths.py --baseline benchmarks/baseline.json --tolerance 0.2
+"""
+import os, io, sys, json, time, logging, argparse, tempfile, tracemalloc, statistics
+from glob import glob
+from typing import Callable, Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.corpus import gen_corpus, gen_papers, make_pdf
+from sparse_index import SparseIndex
+from text_processor import tProcessor
+from paper_download import Download
+from http_client import HttpClient, ResponseCache
+from paper_cache import PaperCache
+from rag_chain import format_doc
+import pdf_parser
+
+QUERY = 'transformer attention language model 트랜스포머 모델'
+SAMPLE_DIR = os.path.join(ROOT, 'benchmarks', 'samples')
+
+class Case:
+    """setup(n) 결과를 받아 실행하는 벤치마크 항목 (setup 시간은 측정에서 제외)"""
+    def __init__(self, name: str, setup: Callable, run: Callable, sizes: Optional[List] = None):
+        self.name = name
+        self.setup = setup
+        self.run = run
+        self.sizes = sizes
+
+def new_processor(tmp: str) -> tProcessor:
+    d = tempfile.mkdtemp(dir=tmp)
+    return tProcessor(
+        index=SparseIndex(os.path.join(d, 'docs')),
+        passage_index=SparseIndex(os.path.join(d, 'passages')),
+        use_embed=False
+    )
+
+def sample_pdfs(tmp: str) -> Dict[str, str]:
+    """benchmarks/samples/*.pdf + 생성한 10/100페이지 PDF"""
+    pdfs = {os.path.basename(p): p for p in sorted(glob(os.path.join(SAMPLE_DIR, '*.pdf')))}
+    for pages in (10, 100):
+        path = os.path.join(tmp, f"generated-{pages}p.pdf")
+        with open(path, 'wb') as f:
+            f.write(make_pdf(pages))
+        pdfs[f"generated-{pages}p.pdf"] = path
+    return pdfs
+
+def build_cases(tmp: str) -> List[Case]:
+    # data/ 아래 실제 라이브러리 / 응답 캐시를 건드리지 않도록 모두 tmp 아래에 두거나 끔
+    downloader = Download(
+        cache=PaperCache(os.path.join(tmp, 'cache')),
+        parser=False,
+        http=HttpClient(cache=ResponseCache(os.path.join(tmp, 'http_cache.sqlite3'))),
+        library=False
+    )
+
+    def processed(n):
+        tp = new_processor(tmp)
+        tp.process_doc(gen_papers(n), save=False)
+        return tp
+
+    def fresh(n):
+        return new_processor(tmp), gen_papers(n)
+
+    def pdf_setup(name):
+        with open(pdfs[name], 'rb') as f:
+            return f.read()
+
+    pdfs = sample_pdfs(tmp)
+    tp = new_processor(tmp)
+
+    return [
+        Case('tProcessor.clean', gen_corpus, lambda docs: [tp.clean(d) for d in docs]),
+        Case('tProcessor.gen_sum', lambda n: [tp.clean(d) for d in gen_corpus(n)], lambda docs: [tp.gen_sum(d) for d in docs]),
+        Case('tProcessor.gen_sum_batch', lambda n: [tp.clean(d) for d in gen_corpus(n)], lambda docs: tp.gen_sum_batch(docs)),
+        Case('tProcessor.Ex_keys', gen_corpus, lambda docs: [tp.Ex_keys(d) for d in docs]),
+        Case('tProcessor.process_doc', fresh, lambda a: a[0].process_doc(a[1], save=False)),
+        Case('tProcessor.rel_doc', processed, lambda t: [t.rel_doc(QUERY, top_k=5) for _ in range(10)]),
+        Case('Download.clean', lambda n: [p['full_text'] for p in gen_papers(n)], lambda docs: [downloader.clean(d) for d in docs]),
+        Case('format_doc', lambda n: processed(n).rel_doc(QUERY, top_k=5), lambda docs: [format_doc(docs) for _ in range(100)]),
+        Case('pdf_parser.extract_pdf', pdf_setup, lambda data: pdf_parser.extract_pdf(io.BytesIO(data), char_budget=10 ** 9),
+             sizes=list(pdfs)),
+    ]
+
+def measure(case: Case, size, repeat: int) -> Dict:
+    times = []
+    for _ in range(repeat):
+        arg = case.setup(size)
+        t = time.perf_counter()
+        case.run(arg)
+        times.append((time.perf_counter() - t) * 1000)
+
+    # 메모리는 tracemalloc 오버헤드가 시간에 섞이지 않도록 별도 1회 측정
+    arg = case.setup(size)
+    tracemalloc.start()
+    case.run(arg)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {'ms': round(statistics.median(times), 3), 'peak_kb': round(peak / 1024, 1)}
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--only', nargs='*', help='이름에 포함된 문자열로 항목 선택')
+    parser.add_argument('--save', help='결과를 기준값 JSON으로 저장')
+    parser.add_argument('--baseline', help='기준값 JSON과 비교')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='허용 증가율 (0.2 = 20%%)')
+    parser.add_argument('--json', help='결과 JSON 출력 경로')
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    results, regressions = {}, []
+    header = f"{'case':<28} {'size':>20} {'ms':>12} {'peak KB':>12} {'baseline ms':>12} {'change':>8}"
+    print(header)
+    print('-' * len(header))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for case in build_cases(tmp):
+            if args.only and not any(o in case.name for o in args.only):
+                continue
+            for size in case.sizes or args.sizes:
+                key = f"{case.name}[{size}]"
+                try:
+                    r = measure(case, size, args.repeat)
+                except Exception as e:
+                    msg = ' '.join(str(e).replace('*', '').split())[:100]
+                    print(f"{case.name:<28} {size!s:>20} 오류: {type(e).__name__}: {msg}")
+                    continue
+                results[key] = r
+
+                base = baseline.get(key, {}).get('ms')
+                change = ''
+                if base:
+                    ratio = r['ms'] / base - 1
+                    change = f"{ratio:+.0%}"
+                    if ratio > args.tolerance:
+                        regressions.append(key)
+                        change += ' !'
+                print(f"{case.name:<28} {size!s:>20} {r['ms']:>12.3f} {r['peak_kb']:>12.1f} {base or '-':>12} {change:>8}")
+
+    for path in (args.save, args.json):
+        if path:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(results, f, indent=2, ensure_ascii=False)
+            print(f"결과 저장: {path}")
+
+    if regressions:
+        print(f"성능 회귀 ({args.tolerance:.0%} 초과): {', '.join(regressions)}")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""
+모듈별 import 시간 벤치마크 (python -X importtime 기반)
+모듈마다 새 인터프리터에서 측정하고 반복 중 최솟값 사용
+
+사용법:
+  python benchmarks/bench_import.py                      # 기본 모듈 측정
+  python benchmarks/bench_import.py --top 10 pipeline    # 무거운 하위 import 상위 10개
+  python benchmarks/bench_import.py --save import_baseline.json
+  python benchmarks/bench_import.py --baseline import_baseline.json --tolerance 0.2
+"""
+import os, re, sys, json, argparse, subprocess
+from typing import Dict, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODULES = [
+    'config', 'rag_chain', 'llm_processor', 'search.intent_module', 'search.paper_search',
+    'paper_download', 'pdf_parser', 'text_processor', 'pipeline', 'app'
+]
+LINE_RE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)$')
+
+def measure(module: str) -> Tuple[float, List[Tuple[str, float]]]:
+    """(모듈 누적 import 시간 ms, [(하위 모듈, 누적 ms)]) 반환"""
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"{module} import 실패:\n{proc.stderr[-2000:]}")
+
+    total, deps = 0.0, []
+    for line in proc.stderr.splitlines():
+        m = LINE_RE.match(line)
+        if not m: continue
+        cum_ms, name = int(m.group(2)) / 1000, m.group(4)
+        if name == module:
+            total = cum_ms
+        else:
+            deps.append((name, cum_ms))
+    return total, deps
+
+def run(modules: List[str], repeat: int) -> Dict[str, Dict]:
+    results = {}
+    for module in modules:
+        runs = [measure(module) for _ in range(repeat)]
+        total, deps = min(runs, key=lambda r: r[0])
+        results[module] = {'ms': round(total, 2), 'deps': deps}
+    return results
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('modules', nargs='*', default=MODULES)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--top', type=int, default=0, help='무거운 하위 import 상위 N개 출력')
+    parser.add_argument('--save', help='결과를 JSON 기준값으로 저장')
+    parser.add_argument('--baseline', help='기준값 JSON과 비교')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='허용 증가율 (0.25 = 25%%)')
+    args = parser.parse_args()
+
+    results = run(args.modules, args.repeat)
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    regressions = []
+    print(f"{'module':<24} {'import ms':>10} {'baseline':>10} {'change':>8}")
+    for module, r in results.items():
+        base = baseline.get(module)
+        change = ''
+        if base:
+            ratio = r['ms'] / base - 1 if base else 0.0
+            change = f"{ratio:+.0%}"
+            if ratio > args.tolerance:
+                regressions.append(module)
+                change += ' !'
+        print(f"{module:<24} {r['ms']:>10.1f} {base if base else '-':>10} {change:>8}")
+
+        if args.top:
+            for name, ms in sorted(r['deps'], key=lambda d: -d[1])[:args.top]:
+                print(f"    {name:<40} {ms:>10.1f}")
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump({m: r['ms'] for m, r in results.items()}, f, indent=2)
+        print(f"기준값 저장: {args.save}")
+
+    if regressions:
+        print(f"import 시간 회귀: {', '.join(regressions)}")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
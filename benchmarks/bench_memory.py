@@ -0,0 +1,71 @@
+"""
+논문 레코드 메모리 벤치마크 (N편당 유지 메모리)
+기존 dict 경로(build_re + prepare + single_doc식 사본, float list 임베딩) vs Paper
+
+사용법: python benchmarks/bench_memory.py --n 10000 --dim 384
+"""
+import os, re, sys, gc, argparse, tracemalloc
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from paper import Paper
+from benchmarks.corpus import gen_corpus
+
+def legacy(base: dict, raw: str, vec: np.ndarray) -> dict:
+    """변경 전 흐름: 본문 / 500자 요약 / 정제본 / original_text / float list 임베딩"""
+    p = dict(base)
+    p['full_text'] = raw
+    p['content_type'] = 'pdf'
+    p['text_length'] = len(raw)
+    p['summary'] = raw[:500] + '...' if len(raw) > 500 else raw
+    p['clean_text'] = re.sub(r'\s+', ' ', raw).strip()
+    p['original_text'] = raw
+    p['embedding'] = vec.tolist()
+    return p
+
+def compact(base: dict, raw: str, vec: np.ndarray) -> Paper:
+    p = Paper.from_dict(base, raw, 'pdf')
+    p.get('clean_text')
+    p['embedding'] = vec.copy()     # 배치 행렬의 view가 아닌 레코드 소유 배열로 측정
+    return p
+
+def measure(build, docs, vecs) -> int:
+    """레코드를 만드는 동안 새로 할당되어 남아 있는 바이트"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    keep = []
+    for i, text in enumerate(docs):
+        base = {'id': f"bench-{i}", 'title': f"Synthetic paper {i}", 'authors': ['Kim J', 'Lee S'],
+                'abstract': text[:600], 'source': 'ArXiv'}
+        raw = text.replace('. ', '.\n  ')      # 다운로드된 PDF 본문 (레코드마다 새 문자열)
+        keep.append(build(base, raw, vecs[i]))
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del keep
+    return used
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--n', type=int, default=10000)
+    parser.add_argument('--dim', type=int, default=384)
+    parser.add_argument('--sentences', type=int, default=40)
+    args = parser.parse_args()
+
+    docs = gen_corpus(args.n, args.sentences)
+    vecs = np.random.default_rng(0).standard_normal((args.n, args.dim)).astype(np.float32)
+    raw_mb = sum(len(d) for d in docs) / 1e6
+
+    print(f"논문 {args.n}편, 본문 합계 {raw_mb:.1f}M자 (문장 {args.sentences}개), 임베딩 {args.dim}차원")
+    print(f"{'record':<10}{'MB':>10}{'KB/paper':>12}{'x text':>10}")
+    print('-' * 42)
+    res = {}
+    for name, build in (('dict', legacy), ('Paper', compact)):
+        used = measure(build, docs, vecs)
+        res[name] = used
+        print(f"{name:<10}{used / 1e6:>10.1f}{used / args.n / 1e3:>12.2f}{used / 1e6 / raw_mb:>10.2f}")
+    print(f"\n절감: {(1 - res['Paper'] / res['dict']) * 100:.1f}%")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""
+검색 지연 시간 벤치마크 (코퍼스 크기별)
+BM25 / 임베딩 / RRF 결합, argpartition vs argsort 비교
+
+사용법: python benchmarks/bench_retrieval.py --sizes 1000 10000 100000
+"""
+import os, sys, time, argparse
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from retrieval import BM25Index, dense_search, rrf, tokenize, top_k
+from benchmarks.corpus import gen_corpus
+
+def timeit(f, repeat: int = 20) -> float:
+    """반복 실행 후 중앙값 (ms)"""
+    ts = []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        f()
+        ts.append((time.perf_counter() - t) * 1000)
+    return float(np.median(ts))
+
+def run(n: int, dim: int, k: int):
+    docs = gen_corpus(n)
+    ids = [str(i) for i in range(n)]
+
+    tokenize('warmup')   # 불용어 지연 import는 측정에서 제외
+    t = time.perf_counter()
+    bm25 = BM25Index().build(ids, docs)
+    build_ms = (time.perf_counter() - t) * 1000
+
+    rng = np.random.default_rng(0)
+    emb = rng.standard_normal((n, dim)).astype(np.float32)
+    emb /= np.linalg.norm(emb, axis=1, keepdims=True)
+    q_vec = emb[0]
+
+    q = 'transformer attention 트랜스포머 모델 장점'
+    scores = bm25.scores(q)
+
+    def hybrid():
+        legs = [[d for d, _ in bm25.search(q, 50)], [d for d, _ in dense_search(emb, ids, q_vec, 50)]]
+        return rrf(legs)[:k]
+
+    return {
+        'n': n,
+        'bm25_build_ms': build_ms,
+        'bm25_query_ms': timeit(lambda: bm25.search(q, k)),
+        'dense_query_ms': timeit(lambda: dense_search(emb, ids, q_vec, k)),
+        'hybrid_query_ms': timeit(hybrid),
+        'argpartition_ms': timeit(lambda: top_k(scores, k)),
+        'argsort_ms': timeit(lambda: np.argsort(-scores)[:k]),
+    }
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--dim', type=int, default=384)
+    parser.add_argument('--k', type=int, default=5)
+    args = parser.parse_args()
+
+    cols = ['n', 'bm25_build_ms', 'bm25_query_ms', 'dense_query_ms', 'hybrid_query_ms', 'argpartition_ms', 'argsort_ms']
+    print(' | '.join(f"{c:>15}" for c in cols))
+    for n in args.sizes:
+        r = run(n, args.dim, args.k)
+        print(' | '.join(f"{r[c]:>15.3f}" if isinstance(r[c], float) else f"{r[c]:>15}" for c in cols))
+
+if __name__ == '__main__':
+    main()
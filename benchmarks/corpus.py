@@ -0,0 +1,71 @@
+"""벤치마크용 합성 코퍼스 / 샘플 PDF 생성"""
+import random
+from itertools import accumulate
+from typing import Dict, List
+
+WORDS = [f"term{i}" for i in range(20000)] + [
+    'transformer', 'attention', 'language', 'model', 'network', 'imaging', 'diagnosis',
+    'clinical', 'crispr', 'gene', 'editing', 'accuracy', 'learning', 'protein', 'patient'
+]
+CUM_WEIGHTS = list(accumulate(1.0 / (i + 1) for i in range(len(WORDS))))   # Zipf 분포
+KO = ['트랜스포머', '모델', '자연어', '처리', '의료', '영상', '진단', '유전자', '임상']
+
+def gen_text(rnd: random.Random, sentences: int = 12, words: int = 18) -> str:
+    out = []
+    for _ in range(sentences):
+        ws = rnd.choices(WORDS, cum_weights=CUM_WEIGHTS, k=words)
+        out.append(' '.join(ws).capitalize())
+    return '. '.join(out) + '.'
+
+def gen_corpus(n: int, sentences: int = 12, seed: int = 0) -> List[str]:
+    """n개 문서 (문장 단위, 일부 한국어 단어 포함)"""
+    rnd = random.Random(seed)
+    return [gen_text(rnd, sentences) + ' ' + ' '.join(rnd.sample(KO, 2)) for _ in range(n)]
+
+def gen_papers(n: int, sentences: int = 12, seed: int = 0) -> List[Dict]:
+    """Download.d_and_p 결과 형태의 논문 dict"""
+    return [
+        {
+            'id': f"bench-{i}",
+            'title': f"Synthetic paper {i}",
+            'authors': ['Kim J', 'Lee S', 'Park H'],
+            'abstract': text[:600],
+            'full_text': text.replace('. ', '.\n  '),
+            'source': 'ArXiv',
+            'content_type': 'pdf'
+        }
+        for i, text in enumerate(gen_corpus(n, sentences, seed))
+    ]
+
+def make_pdf(pages: int, lines_per_page: int = 40, seed: int = 0) -> bytes:
+    """텍스트 페이지로 구성된 최소 PDF (Helvetica, 외부 라이브러리 없이 생성)"""
+    rnd = random.Random(seed)
+    objs = [b"<< /Type /Catalog /Pages 2 0 R >>", None, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+
+    for _ in range(pages):
+        lines = [gen_text(rnd, 1, 12)[:90] for _ in range(lines_per_page)]
+        body = "BT /F1 10 Tf 40 800 Td 12 TL\n" + "\n".join(
+            "(" + l.replace('\\', '').replace('(', '').replace(')', '') + ") '" for l in lines
+        ) + "\nET"
+        stream = body.encode('latin-1', 'ignore')
+        objs.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        content_no = len(objs)
+        objs.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_no
+        )
+        kids.append(len(objs))
+
+    objs[1] = b"<< /Type /Pages /Kids [" + b" ".join(b"%d 0 R" % k for k in kids) + b"] /Count %d >>" % len(kids)
+
+    out, offsets = bytearray(b"%PDF-1.4\n"), []
+    for i, o in enumerate(objs, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % i + o + b"\nendobj\n"
+
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objs) + 1)
+    out += b"".join(b"%010d 00000 n \n" % off for off in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objs) + 1, xref)
+    return bytes(out)
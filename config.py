@@ -4,12 +4,128 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+BASE_DIR = Path(__file__).resolve().parent
+
 class Config:
     GOOGLE_API_KEY = os.getenv('GOOGLE_API_KEY')
 
-    PUBMED_URL = 'https://eutils.ncbi.nlm.nih.gov/entrez/eutils/'
-    ARXIV_URL = 'http://export.arxiv.org/api/query'
+    # 테스트 시 로컬 픽스처 서버로 바꿀 수 있도록 환경 변수 우선
+    PUBMED_URL = os.getenv('PUBMED_URL', 'https://eutils.ncbi.nlm.nih.gov/entrez/eutils/')
+    ARXIV_URL = os.getenv('ARXIV_URL', 'http://export.arxiv.org/api/query')
+    PMC_URL = os.getenv('PMC_URL', 'https://pmc.ncbi.nlm.nih.gov/articles/')
     
     MAX_RESULTS = 15
+    SEARCH_DEADLINE = float(os.getenv('SEARCH_DEADLINE', 8.0))
+
+    # 검색 결과 캐시 TTL (초)
+    SEARCH_CACHE_TTL = {
+        'arxiv': 24 * 3600,
+        'pubmed': 12 * 3600,
+        'analysis': 30 * 24 * 3600,
+        'default': 6 * 3600,
+    }
+    SEARCH_CACHE_MAX_ENTRIES = 20000
+
+    # 소스 간 중복 제거 (식별자 일치 + 제목/초록 MinHash LSH)
+    DEDUP_THRESHOLD = float(os.getenv('DEDUP_THRESHOLD', 0.7))   # 추정 Jaccard 유사도
+    DEDUP_NUM_PERM = 64
+    DEDUP_BANDS = 16
+    DEDUP_SHINGLE = 3
+
+    # 질문 분석 메모이제이션
+    ANALYSIS_MEMO_SIZE = 1024
+    ANALYSIS_PERSIST = os.getenv('ANALYSIS_PERSIST', '1') == '1'
     
-    DEFAULT_MODEL = 'models/gemini-2.5-flash-lite'
\ No newline at end of file
+    DEFAULT_MODEL = 'models/gemini-2.5-flash-lite'
+
+    # 다운로드 (호스트별 (초당 요청 수, 버스트))
+    DOWNLOAD_WORKERS = 8
+    HOST_RATE_LIMITS = {
+        'arxiv.org': (1.0, 2),
+        'pubmed.ncbi.nlm.nih.gov': (2.0, 3),
+        'ncbi.nlm.nih.gov': (3.0, 3),
+    }
+    DEFAULT_HOST_RATE = (2.0, 2)
+
+    # 공유 HTTP 클라이언트 (재시도 / 호스트별 동시 연결 수 / 조건부 요청 캐시)
+    HTTP_RETRIES = int(os.getenv('HTTP_RETRIES', 3))
+    HTTP_BACKOFF = 0.5                # 0.5, 1, 2, ... 초 + jitter
+    HTTP_BACKOFF_MAX = 20
+    HTTP_RETRY_AFTER_MAX = 60         # Retry-After가 이보다 길면 잘라서 대기
+    HTTP_POOL_MAXSIZE = 16
+    HOST_CONCURRENCY = {
+        'arxiv.org': 2,
+        'ncbi.nlm.nih.gov': 4,
+    }
+    DEFAULT_HOST_CONCURRENCY = 4
+    PDF_MAX_BYTES = int(os.getenv('PDF_MAX_BYTES', 30 * 1024 ** 2))
+    PDF_CHAR_BUDGET = int(os.getenv('PDF_CHAR_BUDGET', 60000))
+    PDF_PARSE_WORKERS = int(os.getenv('PDF_PARSE_WORKERS', os.cpu_count() or 1))
+    PDF_PARSE_TIMEOUT = float(os.getenv('PDF_PARSE_TIMEOUT', 30))
+
+    # 파이프라인 (관련도 기준을 넘는 문헌이 충분하면 남은 다운로드 취소)
+    PIPELINE_QUEUE_SIZE = 8
+    PIPELINE_ENOUGH_DOCS = 6
+    PIPELINE_SCORE_THRESHOLD = 0.05
+
+    # 계측 (span / counter, 비활성화 시 오버헤드 없음)
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', '1') == '1'
+
+    # 로컬 논문 라이브러리 (SQLite FTS5, 충분히 찾으면 외부 검색 생략)
+    USE_LIBRARY = os.getenv('USE_LIBRARY', '1') == '1'
+    LIBRARY_MIN_HITS = int(os.getenv('LIBRARY_MIN_HITS', 6))       # 검색어를 모두 포함한 문헌 수 기준
+    LIBRARY_REFRESH_INTERVAL = int(os.getenv('LIBRARY_REFRESH_INTERVAL', 7 * 24 * 3600))  # 같은 검색 구문 백그라운드 갱신 주기 (초)
+
+    # 배치 실행 (질문 분석 / 검색 / LLM 동시 실행 수)
+    BATCH_ANALYZE_WORKERS = int(os.getenv('BATCH_ANALYZE_WORKERS', 8))
+    BATCH_SEARCH_WORKERS = int(os.getenv('BATCH_SEARCH_WORKERS', 4))
+    BATCH_LLM_CONCURRENCY = int(os.getenv('BATCH_LLM_CONCURRENCY', 4))
+
+    # 서버
+    SERVER_HOST = os.getenv('SERVER_HOST', '0.0.0.0')
+    SERVER_PORT = int(os.getenv('SERVER_PORT', 5000))
+
+    # 캐시
+    DATA_DIR = Path(os.getenv('DATA_DIR', BASE_DIR / 'data'))
+    PAPER_CACHE_DIR = DATA_DIR / 'papers'
+    PAPER_CACHE_MAX_BYTES = int(os.getenv('PAPER_CACHE_MAX_BYTES', 2 * 1024 ** 3))
+    SEARCH_CACHE_DB = DATA_DIR / 'search_cache.sqlite3'
+    LIBRARY_DB = DATA_DIR / 'library.sqlite3'
+    HTTP_CACHE_DB = DATA_DIR / 'http_cache.sqlite3'
+    HTTP_CACHE_MAX_ENTRIES = 5000
+    HTTP_CACHE_MAX_BODY = 2 * 1024 ** 2     # 이보다 큰 응답은 저장하지 않음
+
+    # 텍스트 인덱스
+    INDEX_DIR = DATA_DIR / 'tfidf_index'
+    INDEX_FEATURES = 2 ** 18
+    INDEX_MERGE_RATIO = 1           # 직전 세그먼트가 새 세그먼트의 이 배수 이하이면 병합 (세그먼트 수 ~ log N)
+    INDEX_MAX_SEGMENTS = 32
+    PASSAGE_INDEX_DIR = DATA_DIR / 'passage_index'
+
+    # 문단(passage) 검색
+    USE_PASSAGES = os.getenv('USE_PASSAGES', '1') == '1'
+    CHUNK_CHARS = 800
+    CHUNK_OVERLAP = 200
+    PASSAGE_TOP_K = 12
+    PASSAGES_PER_DOC = 3
+
+    # LLM 컨텍스트 압축 (질문 관련 문장만, 출처별 예산은 relevance_score 비례)
+    USE_COMPRESSION = os.getenv('USE_COMPRESSION', '1') == '1'
+    CONTEXT_TOKEN_BUDGET = int(os.getenv('CONTEXT_TOKEN_BUDGET', 2000))
+    CONTEXT_MIN_TOKENS = 60           # 출처당 최소 예산
+    CONTEXT_REDUNDANCY = 0.8          # 이미 고른 문장과 코사인 유사도가 이 이상이면 제외
+    CONTEXT_SOURCE_CHARS = 20000      # 출처당 문장 후보로 보는 최대 글자 수
+
+    # 검색 방식: 'tfidf' | 'bm25' | 'dense' | 'hybrid' (BM25 + 임베딩, RRF 결합)
+    RETRIEVAL_MODE = os.getenv('RETRIEVAL_MODE', 'hybrid')
+    BM25_K1 = 1.5
+    BM25_B = 0.75
+    RRF_K = 60
+    HYBRID_CANDIDATES = 50
+
+    # 임베딩
+    EMBEDDING_MODEL = os.getenv('EMBEDDING_MODEL', 'sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2')
+    EMBEDDING_DB = DATA_DIR / 'embeddings.sqlite3'
+    EMBED_BATCH_SIZE = int(os.getenv('EMBED_BATCH_SIZE', 64))
+    EMBED_MAX_CHARS = 2000
+    USE_EMBEDDINGS = os.getenv('USE_EMBEDDINGS', '1') == '1'
@@ -0,0 +1,107 @@
+"""
+질문 중심 컨텍스트 압축 (rel_doc -> 압축 -> gen_res)
+- 출처 문장을 질문과의 유사도로 채점
+- 다른 출처에서 이미 고른 문장과 거의 같은 문장은 제외
+- 전체 토큰 예산을 relevance_score에 비례해 출처별로 나눔
+출처 목록의 순서 / 개수는 바꾸지 않으므로 [출처 n] 번호가 유지됨
+"""
+import re, logging
+import numpy as np
+from typing import Dict, List
+from config import Config
+import summarizer
+
+logger = logging.getLogger(__name__)
+
+SENT_RE = re.compile(r'(?<=[.!?])\s+')
+HANGUL_RE = re.compile(r'[가-힣]')
+
+def est_tokens(text: str) -> int:
+    """대략적인 토큰 수 (영문 약 4자당 1토큰, 한글은 글자당 약 1토큰)"""
+    ko = len(HANGUL_RE.findall(text))
+    return max(1, ko + (len(text) - ko) // 4)
+
+def truncate(text: str, tokens: int) -> str:
+    """est_tokens 기준 tokens 이하가 되는 가장 긴 앞부분 (한글 / 영문 혼합 모두)"""
+    if est_tokens(text) <= tokens: return text
+    lo, hi = 0, len(text)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if est_tokens(text[:mid]) <= tokens:
+            lo = mid
+        else:
+            hi = mid - 1
+    return text[:lo]
+
+def source_text(d: Dict) -> str:
+    if d.get('passages'):
+        text = ' '.join(p['text'] for p in d['passages'])
+    else:
+        text = d.get('clean_text') or d.get('abstract') or ''
+    return text[:Config.CONTEXT_SOURCE_CHARS]
+
+def split(text: str) -> List[str]:
+    return [s.strip() for s in SENT_RE.split(text) if len(s.strip()) >= 20]
+
+def budgets(docs: List[Dict], total: int, floor: int) -> List[int]:
+    """
+    relevance_score 순위로 배분 (r위 출처 가중치 1/r, 출처당 최소 floor)
+    점수 자체가 아니라 순위를 쓰므로 RRF처럼 값 차이가 거의 없는 점수에서도 차등이 생김
+    """
+    scores = np.array([float(d.get('relevance_score') or 0.0) for d in docs])
+    if np.ptp(scores) > 0:
+        w = np.empty(len(docs))
+        w[np.argsort(-scores, kind='stable')] = 1.0 / np.arange(1, len(docs) + 1)
+        w /= w.sum()
+    else:
+        w = np.full(len(docs), 1.0 / len(docs))
+    floor = min(floor, total // len(docs))
+    return [int(floor + (total - floor * len(docs)) * x) for x in w]
+
+def compress(q: str, docs: List[Dict], budget: int = None, redundancy: float = None) -> List[Dict]:
+    """
+    각 문서에 압축된 'context' 추가 (format_doc이 우선 사용)
+    relevance_score가 높은 출처부터 문장을 고르고, 남은 예산은 다음 출처로 넘김
+    """
+    if not docs: return docs
+    budget = budget or Config.CONTEXT_TOKEN_BUDGET
+    redundancy = Config.CONTEXT_REDUNDANCY if redundancy is None else redundancy
+
+    sents = [split(source_text(d)) for d in docs]
+    X, offsets = summarizer.sentence_matrix(sents + [[q]])
+    n = offsets[-2]
+    sim = np.asarray((X[:n] @ X[n:].T).todense()).ravel()
+    picked: List[int] = []                  # 이미 고른 문장 행 (중복 제거는 이 행들과만 비교)
+    P = None
+
+    shares = budgets(docs, budget, Config.CONTEXT_MIN_TOKENS)
+    order = sorted(range(len(docs)), key=lambda i: -float(docs[i].get('relevance_score') or 0.0))
+
+    carry, before, after = 0, 0, 0
+    for i in order:
+        a, cands = offsets[i], sents[i]
+        allow = shares[i] + carry
+        before += sum(est_tokens(s) for s in cands)
+
+        chosen, used = [], 0
+        for j in np.argsort(-sim[a:a + len(cands)], kind='stable'):
+            if used >= allow: break
+            if P is not None and (X[a + j] @ P.T).max() >= redundancy: continue
+
+            t = est_tokens(cands[j])
+            if used + t > allow:
+                if chosen: continue
+                # 첫 문장이 예산보다 길면 잘라서라도 하나는 포함
+                cands[j] = truncate(cands[j], allow)
+                t = est_tokens(cands[j])
+            chosen.append(j)
+            picked.append(a + j)
+            P = X[picked]
+            used += t
+
+        carry = max(allow - used, 0)
+        after += used
+        docs[i]['context'] = ' '.join(cands[j] for j in sorted(chosen)) if chosen else (docs[i].get('abstract') or '')[:400]
+
+    logger.info(f"컨텍스트 압축: 약 {before} -> {after} 토큰 (예산 {budget})")
+    return docs
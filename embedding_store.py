@@ -0,0 +1,53 @@
+import sqlite3, hashlib, logging, threading
+import numpy as np
+from pathlib import Path
+from typing import Dict, Iterable, Union
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+class EmbeddingStore:
+    """(모델명, 텍스트 해시) -> 임베딩 벡터 SQLite 캐시"""
+    def __init__(self, path: Union[str, Path] = None):
+        path = Path(path or Config.EMBEDDING_DB)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(str(path), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " model TEXT NOT NULL, hash TEXT NOT NULL, dim INTEGER NOT NULL, vec BLOB NOT NULL,"
+            " PRIMARY KEY (model, hash))"
+        )
+        self.conn.commit()
+
+    @staticmethod
+    def text_hash(text: str) -> str:
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    def get_many(self, model: str, hashes: Iterable[str]) -> Dict[str, np.ndarray]:
+        """캐시된 벡터 조회 (없는 해시는 결과에서 제외)"""
+        hashes = list(dict.fromkeys(hashes))
+        found = {}
+
+        with self.lock:
+            for i in range(0, len(hashes), 500):
+                part = hashes[i:i + 500]
+                rows = self.conn.execute(
+                    f"SELECT hash, vec FROM embeddings WHERE model = ? AND hash IN ({','.join('?' * len(part))})",
+                    [model, *part]
+                ).fetchall()
+                for h, blob in rows:
+                    found[h] = np.frombuffer(blob, dtype=np.float32)
+        return found
+
+    def put_many(self, model: str, vecs: Dict[str, np.ndarray]):
+        rows = [(model, h, int(v.shape[-1]), np.asarray(v, dtype=np.float32).tobytes()) for h, v in vecs.items()]
+        with self.lock:
+            self.conn.executemany("INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?, ?)", rows)
+            self.conn.commit()
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
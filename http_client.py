@@ -0,0 +1,232 @@
+"""
+Search / Download가 함께 쓰는 HTTP 클라이언트
+- 연결 풀 공유, 호스트별 동시 요청 수 제한 + 토큰 버킷(HostLimiter)
+- 429 / 5xx 재시도 (지수 백오프 + jitter, Retry-After 준수)
+- ETag / Last-Modified 조건부 요청으로 로컬 응답 캐시 재검증
+"""
+import json, time, random, sqlite3, logging, threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple, Union
+from urllib.parse import urlparse
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from urllib3.util.retry import Retry
+from config import Config
+from rate_limiter import HostLimiter
+import metrics
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = 'Academic-RAG-Bot/1.0 (non-commercial)'
+RETRY_STATUS = (429, 500, 502, 503, 504)
+
+class BackoffRetry(Retry):
+    """
+    지수 백오프에 jitter를 더하고, Retry-After는 HTTP_RETRY_AFTER_MAX까지만 따르는 Retry
+    limiter를 주면 재시도마다 호스트 토큰을 하나씩 받음 (첫 시도는 HttpClient가 받음)
+    """
+    def __init__(self, *args, limiter: Optional[HostLimiter] = None, **kw):
+        super().__init__(*args, **kw)
+        self.limiter = limiter
+
+    def new(self, **kw) -> 'BackoffRetry':
+        retry = super().new(**kw)
+        retry.limiter = self.limiter
+        return retry
+
+    def get_backoff_time(self) -> float:
+        t = super().get_backoff_time()
+        return min(t + random.uniform(0, t) if t else 0.0, Config.HTTP_BACKOFF_MAX)
+
+    def parse_retry_after(self, retry_after: str) -> float:
+        return min(super().parse_retry_after(retry_after), Config.HTTP_RETRY_AFTER_MAX)
+
+    def increment(self, method=None, url=None, response=None, error=None, _pool=None, _stacktrace=None):
+        host = getattr(_pool, 'host', '') or ''
+        status = response.status if response is not None else type(error).__name__
+        metrics.count('rag_http_retries_total', trace_key='http.retries', host=host)
+        logger.info(f"HTTP 재시도 ({status}): {host}{url or ''}")
+        retry = super().increment(method, url, response, error, _pool, _stacktrace)
+        # 재시도 요청도 호스트 속도 제한에 포함
+        if self.limiter is not None and host:
+            self.limiter.wait(f"{getattr(_pool, 'scheme', 'https')}://{host}")
+        return retry
+
+class ResponseCache:
+    """조건부 요청용 응답 캐시 (URL -> ETag / Last-Modified / 본문)"""
+    def __init__(self, path: Union[str, Path] = None, max_entries: int = None, max_body: int = None):
+        path = Path(path or Config.HTTP_CACHE_DB)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries or Config.HTTP_CACHE_MAX_ENTRIES
+        self.max_body = max_body or Config.HTTP_CACHE_MAX_BODY
+        self.lock = threading.Lock()
+        self.writes = 0
+
+        self.conn = sqlite3.connect(str(path), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, headers TEXT NOT NULL,"
+            " body BLOB NOT NULL, accessed REAL NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+        self.conn.commit()
+
+    def get(self, url: str) -> Optional[Tuple[Optional[str], Optional[str], Dict, bytes]]:
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT etag, last_modified, headers, body FROM responses WHERE url = ?", (url,)
+            ).fetchone()
+        if row is None: return None
+        return row[0], row[1], json.loads(row[2]), row[3]
+
+    def touch(self, url: str):
+        with self.lock:
+            self.conn.execute("UPDATE responses SET accessed = ? WHERE url = ?", (time.time(), url))
+            self.conn.commit()
+
+    def put(self, url: str, res: requests.Response) -> bool:
+        etag, modified = res.headers.get('ETag'), res.headers.get('Last-Modified')
+        if not (etag or modified) or len(res.content) > self.max_body:
+            return False
+
+        headers = {k: v for k, v in res.headers.items() if k.lower() in ('content-type', 'etag', 'last-modified')}
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                (url, etag, modified, json.dumps(headers), res.content, time.time())
+            )
+            self.writes += 1
+            if self.writes % 50 == 0:
+                self.evict()
+            self.conn.commit()
+        return True
+
+    def evict(self):
+        """항목 수 초과분을 마지막 사용 시각 순으로 삭제 (lock 보유 상태에서 호출)"""
+        n = self.conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        if n > self.max_entries:
+            self.conn.execute(
+                "DELETE FROM responses WHERE rowid IN (SELECT rowid FROM responses ORDER BY accessed LIMIT ?)",
+                (n - self.max_entries,)
+            )
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+class HttpClient:
+    def __init__(self, limiter: Optional[HostLimiter] = None, cache: Optional[ResponseCache] = None,
+                 concurrency: Optional[Dict[str, int]] = None, retries: int = None):
+        self.limiter = limiter or HostLimiter()
+        self.cache = cache if cache is not None else ResponseCache()
+        self.concurrency = Config.HOST_CONCURRENCY if concurrency is None else concurrency
+        self.slots: Dict[str, threading.BoundedSemaphore] = {}
+        self.lock = threading.Lock()
+
+        retry = BackoffRetry(
+            total=Config.HTTP_RETRIES if retries is None else retries,
+            backoff_factor=Config.HTTP_BACKOFF,
+            status_forcelist=RETRY_STATUS,
+            allowed_methods=frozenset({'GET', 'HEAD'}),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+            limiter=self.limiter,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=len(self.limiter.limits) + 4,
+            pool_maxsize=Config.HTTP_POOL_MAXSIZE,
+            max_retries=retry,
+        )
+        self.session = requests.Session()
+        self.session.headers.update({'User-Agent': USER_AGENT, 'Accept-Encoding': 'gzip, deflate'})
+        self.session.hooks['response'].append(metrics.http_hook)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def slot(self, url: str) -> threading.BoundedSemaphore:
+        """호스트별 동시 요청 수 제한 (서브도메인은 상위 도메인과 공유)"""
+        host = (urlparse(url).hostname or '').lower()
+        key, n = host, Config.DEFAULT_HOST_CONCURRENCY
+        for pattern, limit in self.concurrency.items():
+            if host == pattern or host.endswith('.' + pattern):
+                key, n = pattern, limit
+                break
+
+        with self.lock:
+            s = self.slots.get(key)
+            if s is None:
+                s = self.slots[key] = threading.BoundedSemaphore(n)
+        return s
+
+    def get(self, url: str, params: Dict = None, revalidate: bool = True, **kw) -> requests.Response:
+        """
+        GET (재시도 / 호스트별 제한 적용)
+        revalidate=True면 저장된 ETag / Last-Modified로 조건부 요청, 304면 캐시 본문으로 응답 구성
+        """
+        full = requests.Request('GET', url, params=params).prepare().url
+        cached = self.cache.get(full) if revalidate and self.cache else None
+
+        headers = dict(kw.pop('headers', None) or {})
+        if cached:
+            etag, modified = cached[0], cached[1]
+            if etag: headers['If-None-Match'] = etag
+            if modified: headers['If-Modified-Since'] = modified
+
+        with self.slot(url):
+            self.limiter.wait(url)
+            res = self.session.get(full, headers=headers, **kw)
+
+        if cached and res.status_code == 304:
+            metrics.cache('http', True)
+            self.cache.touch(full)
+            return self.from_cache(full, cached)
+
+        if revalidate and self.cache:
+            metrics.cache('http', False)
+            if res.status_code == 200:
+                self.cache.put(full, res)
+        return res
+
+    @contextmanager
+    def stream(self, url: str, params: Dict = None, **kw) -> Iterator[requests.Response]:
+        """스트리밍 GET (본문을 다 읽을 때까지 호스트 슬롯 유지, gzip 자동 해제)"""
+        with self.slot(url):
+            self.limiter.wait(url)
+            res = self.session.get(url, params=params, stream=True, **kw)
+            try:
+                res.raw.decode_content = True
+                yield res
+            finally:
+                res.close()
+
+    @staticmethod
+    def from_cache(url: str, cached) -> requests.Response:
+        res = requests.Response()
+        res.status_code = 200
+        res.reason = 'OK'
+        res.url = url
+        res.headers = CaseInsensitiveDict(cached[2])
+        res._content = cached[3]
+        res.encoding = requests.utils.get_encoding_from_headers(res.headers)
+        res.from_cache = True
+        return res
+
+    def close(self):
+        self.session.close()
+        if self.cache:
+            self.cache.close()
+
+_client = None
+_lock = threading.Lock()
+
+def get_client() -> HttpClient:
+    """프로세스 공유 HTTP 클라이언트 (최초 사용 시 생성)"""
+    global _client
+    if _client is None:
+        with _lock:
+            if _client is None:
+                _client = HttpClient()
+    return _client
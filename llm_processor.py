@@ -1,7 +1,10 @@
-from typing import List, Dict
-import re
+from typing import AsyncIterator, Dict, Iterator, List, Optional
+import re, time, logging
 from config import Config
-from rag_chain import rag_chain, format_doc
+from rag_chain import get_chain, format_doc
+import metrics
+
+logger = logging.getLogger(__name__)
 
 class LLMProcessor:
     def __init__(self):
@@ -13,10 +16,12 @@ class LLMProcessor:
             return {"answer": "관련 논문을 찾지 못해 답변을 생성할 수 없습니다.", "sources": []}
         
         format_cont = format_doc(ps)
+        metrics.count('rag_llm_prompt_chars_total', len(format_cont), trace_key='llm.prompt_chars')
 
         try:
             print("Lang Chain을 사용하여 답변 생성 중...")
-            answer = rag_chain.invoke({"context": format_cont, "question": question})
+            with metrics.span('llm.generate', docs=len(ps)):
+                answer = get_chain().invoke({"context": format_cont, "question": question})
         except Exception as e:
             print(f"Lang Chain 답변 생성 오류: {e}")
             answer = "답변 생성 중 오류가 발생했습니다."
@@ -24,6 +29,80 @@ class LLMProcessor:
         sources_info = self.prepare_sources(ps)
         return {"answer":answer.strip(), "sources": sources_info}
     
+    def gen_res_stream(self, question: str, ps: List[Dict]) -> Iterator[Dict]:
+        """
+        최종 응답 스트리밍 생성
+        이벤트 순서: sources (LLM 호출 전) -> token ... -> done (첫 토큰 시간 등 계측값)
+        """
+        state = {"start": time.perf_counter(), "ttft": None, "chars": 0}
+        yield {"type": "sources", "sources": self.prepare_sources(ps)}
+        if not ps:
+            yield from self.stream_empty()
+            return
+
+        try:
+            for chunk in get_chain().stream(self.stream_input(question, ps)):
+                event = self.stream_chunk(state, chunk)
+                if event: yield event
+        except Exception as e:
+            yield self.stream_error(e)
+
+        yield self.stream_done(state)
+
+    async def agen_res_stream(self, question: str, ps: List[Dict]) -> AsyncIterator[Dict]:
+        """gen_res_stream의 비동기 버전 (rag_chain.astream 사용)"""
+        state = {"start": time.perf_counter(), "ttft": None, "chars": 0}
+        yield {"type": "sources", "sources": self.prepare_sources(ps)}
+        if not ps:
+            for event in self.stream_empty():
+                yield event
+            return
+
+        try:
+            async for chunk in get_chain().astream(self.stream_input(question, ps)):
+                event = self.stream_chunk(state, chunk)
+                if event: yield event
+        except Exception as e:
+            yield self.stream_error(e)
+
+        yield self.stream_done(state)
+
+    # gen_res_stream / agen_res_stream 공통 처리
+    def stream_input(self, question: str, ps: List[Dict]) -> Dict:
+        format_cont = format_doc(ps)
+        metrics.count('rag_llm_prompt_chars_total', len(format_cont), trace_key='llm.prompt_chars')
+        return {"context": format_cont, "question": question}
+
+    def stream_empty(self) -> List[Dict]:
+        return [
+            {"type": "token", "text": "관련 논문을 찾지 못해 답변을 생성할 수 없습니다."},
+            {"type": "done", "ttft": None, "elapsed": 0.0, "chars": 0}
+        ]
+
+    def stream_chunk(self, state: Dict, chunk: str) -> Optional[Dict]:
+        """청크 하나 -> token 이벤트 (빈 청크는 None), 첫 토큰 시간 / 글자 수 누적"""
+        if not chunk: return None
+        if state["ttft"] is None:
+            state["ttft"] = time.perf_counter() - state["start"]
+            logger.info(f"첫 토큰까지 {state['ttft']:.3f}s")
+        state["chars"] += len(chunk)
+        return {"type": "token", "text": chunk}
+
+    def stream_error(self, e: Exception) -> Dict:
+        logger.error(f"Lang Chain 스트리밍 오류: {e}")
+        return {"type": "error", "message": "답변 생성 중 오류가 발생했습니다."}
+
+    def stream_done(self, state: Dict) -> Dict:
+        ttft = state["ttft"]
+        done = {
+            "type": "done",
+            "ttft": round(ttft, 3) if ttft is not None else None,
+            "elapsed": round(time.perf_counter() - state["start"], 3),
+            "chars": state["chars"]
+        }
+        logger.info(f"답변 스트리밍 완료: {done['chars']}자, 총 {done['elapsed']}s (첫 토큰 {done['ttft']}s)")
+        return done
+
     def format_citation(self, p:Dict, n:int) -> str:
         authors = p.get('authors', [])
         author_s = "" 
@@ -0,0 +1,215 @@
+"""
+경량 계측 (span / counter)
+- 프로세스 전체 누적값은 Prometheus 텍스트로, 요청 단위 기록은 JSON으로 내보냄
+- 비활성화 시 span / count는 즉시 반환 (Config.METRICS_ENABLED)
+"""
+import time, uuid, threading, contextvars
+from contextlib import contextmanager
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse
+from config import Config
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+HELP = {
+    'rag_stage_duration_seconds': ('histogram', '파이프라인 단계별 소요 시간'),
+    'rag_http_requests_total': ('counter', 'HTTP 응답 수 (호스트, 상태 코드별)'),
+    'rag_http_response_bytes_total': ('counter', 'HTTP 응답 크기 합계 (Content-Length 기준)'),
+    'rag_http_retries_total': ('counter', 'HTTP 재시도 수 (호스트별)'),
+    'rag_pdf_pages_parsed_total': ('counter', '파싱한 PDF 페이지 수'),
+    'rag_pdf_parse_aborted_total': ('counter', '파싱 풀 재시작으로 함께 중단된 PDF 파싱 수'),
+    'rag_cache_requests_total': ('counter', '캐시 조회 수 (캐시, 적중 여부별)'),
+    'rag_llm_prompt_chars_total': ('counter', 'LLM 프롬프트 글자 수 합계'),
+}
+
+enabled = Config.METRICS_ENABLED
+_lock = threading.Lock()
+_counters: Dict[Tuple[str, Tuple], float] = {}
+_hists: Dict[Tuple[str, Tuple], list] = {}        # [bucket counts..., sum, count]
+_trace: contextvars.ContextVar = contextvars.ContextVar('rag_trace', default=None)
+
+class Trace:
+    """요청 하나에서 발생한 span / counter 기록"""
+    def __init__(self, name: str):
+        self.id = uuid.uuid4().hex[:16]
+        self.name = name
+        self.start = time.perf_counter()
+        self.spans = []
+        self.counters: Dict[str, float] = {}
+        self.lock = threading.Lock()
+
+    def to_dict(self) -> Dict:
+        with self.lock:
+            counters = dict(self.counters)
+            spans = list(self.spans)
+
+        ratios = {}
+        for key, v in counters.items():
+            if key.startswith('cache.') and key.endswith('.hit'):
+                cache = key[len('cache.'):-len('.hit')]
+                total = v + counters.get(f"cache.{cache}.miss", 0)
+                ratios[cache] = round(v / total, 3) if total else None
+
+        return {
+            'trace_id': self.id,
+            'name': self.name,
+            'elapsed': round(time.perf_counter() - self.start, 4),
+            'spans': spans,
+            'counters': counters,
+            'cache_hit_ratio': ratios,
+        }
+
+class _NoopSpan:
+    def __enter__(self): return self
+    def __exit__(self, *exc): return False
+    def set(self, **attrs): pass
+
+NOOP = _NoopSpan()
+
+class _Span:
+    def __init__(self, name: str, attrs: Dict):
+        self.name = name
+        self.attrs = attrs
+
+    def __enter__(self):
+        self.t = time.perf_counter()
+        return self
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def __exit__(self, exc_type, exc, tb):
+        duration = time.perf_counter() - self.t
+        observe('rag_stage_duration_seconds', duration, stage=self.name)
+
+        tr = _trace.get()
+        if tr is not None:
+            rec = {
+                'name': self.name,
+                'start': round(self.t - tr.start, 4),
+                'duration': round(duration, 4),
+                'thread': threading.current_thread().name,
+            }
+            if self.attrs:
+                rec['attrs'] = self.attrs
+            if exc_type is not None:
+                rec['error'] = exc_type.__name__
+            with tr.lock:
+                tr.spans.append(rec)
+        return False
+
+def span(name: str, **attrs):
+    """with metrics.span('search.arxiv'): ... 구간 시간 기록"""
+    return _Span(name, attrs) if enabled else NOOP
+
+def _labels(labels: Dict) -> Tuple:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+def count(name: str, value: float = 1, trace_key: str = None, **labels):
+    """누적 카운터 증가 (trace_key가 있으면 현재 요청 기록에도 합산)"""
+    if not enabled: return
+    key = (name, _labels(labels))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+    tr = _trace.get()
+    if tr is not None and trace_key:
+        with tr.lock:
+            tr.counters[trace_key] = tr.counters.get(trace_key, 0) + value
+
+def observe(name: str, value: float, **labels):
+    if not enabled: return
+    key = (name, _labels(labels))
+    with _lock:
+        h = _hists.get(key)
+        if h is None:
+            h = _hists[key] = [0] * len(BUCKETS) + [0.0, 0]
+        for i, b in enumerate(BUCKETS):
+            if value <= b:
+                h[i] += 1
+        h[-2] += value
+        h[-1] += 1
+
+def cache(name: str, hit: bool, n: int = 1):
+    """캐시 적중/실패 기록"""
+    if not enabled or n <= 0: return
+    result = 'hit' if hit else 'miss'
+    count('rag_cache_requests_total', n, trace_key=f"cache.{name}.{result}", cache=name, result=result)
+
+def http(url: str, status: int, nbytes: Optional[int]):
+    if not enabled: return
+    host = urlparse(url).hostname or ''
+    count('rag_http_requests_total', trace_key='http.requests', host=host, status=status)
+    if nbytes:
+        count('rag_http_response_bytes_total', nbytes, trace_key='http.bytes', host=host)
+
+def http_hook(res, *args, **kwargs):
+    """requests 응답 hook: session.hooks['response'].append(metrics.http_hook)"""
+    if enabled:
+        length = res.headers.get('Content-Length')
+        http(res.url, res.status_code, int(length) if length and length.isdigit() else None)
+    return res
+
+@contextmanager
+def trace(name: str = 'request'):
+    """요청 단위 기록 시작 (비활성화 시 None)"""
+    if not enabled:
+        yield None
+        return
+    tr = Trace(name)
+    token = _trace.set(tr)
+    try:
+        yield tr
+    finally:
+        try:
+            _trace.reset(token)
+        except ValueError:
+            # 제너레이터가 다른 컨텍스트에서 재개된 경우
+            _trace.set(None)
+
+def current() -> Optional[Trace]:
+    return _trace.get()
+
+def submit(pool, fn, *args, **kwargs):
+    """현재 요청 기록을 워커 스레드로 전달하며 제출"""
+    if not enabled:
+        return pool.submit(fn, *args, **kwargs)
+    ctx = contextvars.copy_context()
+    return pool.submit(ctx.run, fn, *args, **kwargs)
+
+def prometheus() -> str:
+    """누적값을 Prometheus 텍스트 형식으로"""
+    def fmt(labels: Tuple, extra: Tuple = ()) -> str:
+        items = list(labels) + list(extra)
+        if not items: return ''
+        return '{' + ','.join(f'{k}="{v}"' for k, v in items) + '}'
+
+    with _lock:
+        counters = dict(_counters)
+        hists = {k: list(v) for k, v in _hists.items()}
+
+    lines, seen = [], set()
+    def header(name):
+        if name in seen: return
+        seen.add(name)
+        kind, desc = HELP.get(name, ('untyped', name))
+        lines.append(f"# HELP {name} {desc}")
+        lines.append(f"# TYPE {name} {kind}")
+
+    for (name, labels), v in sorted(counters.items()):
+        header(name)
+        lines.append(f"{name}{fmt(labels)} {v:g}")
+
+    for (name, labels), h in sorted(hists.items()):
+        header(name)
+        for b, c in zip(BUCKETS, h):
+            lines.append(f"{name}_bucket{fmt(labels, (('le', f'{b:g}'),))} {c}")
+        lines.append(f"{name}_bucket{fmt(labels, (('le', '+Inf'),))} {h[-1]}")
+        lines.append(f"{name}_sum{fmt(labels)} {h[-2]:.6f}")
+        lines.append(f"{name}_count{fmt(labels)} {h[-1]}")
+
+    return '\n'.join(lines) + '\n'
+
+def reset():
+    with _lock:
+        _counters.clear()
+        _hists.clear()
@@ -0,0 +1,167 @@
+"""
+논문 레코드
+- 본문은 하나의 버퍼(text)만 보관, 정제본 / 요약(snippet)은 필요할 때 계산
+- 임베딩은 float32 numpy 배열
+- dict처럼 p['clean_text'], p.get('title') 으로 접근 가능 (format_doc, LLMProcessor 호환)
+"""
+import re
+import numpy as np
+from typing import Any, Dict, Iterator
+
+FIELDS = ('id', 'title', 'authors', 'abstract', 'year', 'doi', 'pmc_id',
+          'pdf_url', 'web_url', 'source', 'content_type')
+SNIPPET_CHARS = 500
+WS_RE = re.compile(r'\s+')
+_MISSING = object()
+
+class Paper:
+    """
+    본문 관련 키는 text 하나에서 파생
+    'full_text' / 'original_text': 본문, 'clean_text': 공백 정리본 (최초 접근 시 text를 정리본으로 교체),
+    'summary': 따로 지정하지 않으면 앞 500자, 'text_length': 본문 길이
+    """
+    __slots__ = FIELDS + ('text', 'cleaned', 'embedding', 'extra')
+
+    def __init__(self, text: str = '', embedding=None, **fields):
+        for k in FIELDS:
+            setattr(self, k, fields.pop(k, None))
+        self.text = text or ''
+        self.cleaned = False
+        self.embedding = None
+        self.extra: Dict[str, Any] = fields
+        if embedding is not None:
+            self.set_embedding(embedding)
+
+    @classmethod
+    def from_dict(cls, d: Dict, text: str = None, content_type: str = None) -> 'Paper':
+        """검색 결과 dict -> Paper (본문 관련 파생 키는 버림)"""
+        if isinstance(d, Paper):
+            p = d
+        else:
+            fields = {k: v for k, v in d.items()
+                      if k not in ('full_text', 'clean_text', 'original_text', 'text_length', 'summary', 'embedding')}
+            p = cls(text=d.get('full_text') or '', embedding=d.get('embedding'), **fields)
+        if text is not None:
+            p['full_text'] = text
+        if content_type is not None:
+            p.content_type = content_type
+        return p
+
+    @property
+    def clean_text(self) -> str:
+        if not self.cleaned:
+            self.text = WS_RE.sub(' ', self.text).strip()
+            self.cleaned = True
+        return self.text
+
+    @property
+    def snippet(self) -> str:
+        t = self.text
+        return t[:SNIPPET_CHARS] + '...' if len(t) > SNIPPET_CHARS else t
+
+    def copy(self) -> 'Paper':
+        """얕은 복사 (본문 문자열 / 임베딩 배열은 공유, 질문별 점수는 따로)"""
+        p = Paper.__new__(Paper)
+        for k in Paper.__slots__:
+            setattr(p, k, getattr(self, k))
+        p.extra = dict(self.extra)
+        return p
+
+    def set_embedding(self, v):
+        self.embedding = None if v is None else np.asarray(v, dtype=np.float32)
+
+    # dict 호환
+    def __getitem__(self, key: str):
+        v = self.get(key, _MISSING)
+        if v is _MISSING:
+            raise KeyError(key)
+        return v
+
+    def get(self, key: str, default=None):
+        if key in FIELDS:
+            v = getattr(self, key)
+        elif key in ('full_text', 'original_text'):
+            v = self.text or None
+        elif key == 'clean_text':
+            v = self.clean_text if self.text else None
+        elif key == 'summary':
+            v = self.extra.get('summary') or (self.snippet if self.text else None)
+        elif key == 'text_length':
+            v = len(self.text)
+        elif key == 'embedding':
+            v = self.embedding
+        else:
+            return self.extra.get(key, default)
+        return default if v is None else v
+
+    def __setitem__(self, key: str, value):
+        if key in FIELDS:
+            setattr(self, key, value)
+        elif key in ('full_text', 'original_text'):
+            self.text, self.cleaned = value or '', False
+        elif key == 'clean_text':
+            self.text, self.cleaned = value or '', True
+        elif key == 'embedding':
+            self.set_embedding(value)
+        elif key == 'text_length':
+            pass
+        else:
+            self.extra[key] = value
+
+    def __delitem__(self, key: str):
+        if key not in self:
+            raise KeyError(key)
+        self.pop(key)
+
+    def pop(self, key: str, default=_MISSING):
+        v = self.get(key, _MISSING)
+        if v is _MISSING:
+            if default is _MISSING:
+                raise KeyError(key)
+            return default
+        if key in self.extra:
+            del self.extra[key]
+        elif key in FIELDS:
+            setattr(self, key, None)
+        elif key == 'embedding':
+            self.embedding = None
+        elif key in ('full_text', 'original_text', 'clean_text'):
+            self.text, self.cleaned = '', False
+        return v
+
+    def setdefault(self, key: str, default=None):
+        v = self.get(key, _MISSING)
+        if v is _MISSING:
+            self[key] = default
+            return default
+        return v
+
+    def update(self, other=(), **kw):
+        for k, v in dict(other, **kw).items():
+            self[k] = v
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def keys(self) -> Iterator[str]:
+        for k in FIELDS:
+            if getattr(self, k) is not None:
+                yield k
+        if self.text:
+            yield from ('full_text', 'clean_text', 'text_length')
+        if self.text or 'summary' in self.extra:
+            yield 'summary'
+        if self.embedding is not None:
+            yield 'embedding'
+        yield from (k for k in self.extra if k != 'summary')
+
+    __iter__ = keys
+
+    def items(self):
+        return ((k, self[k]) for k in self.keys())
+
+    def to_dict(self) -> Dict:
+        return dict(self.items())
+
+    def __repr__(self) -> str:
+        return f"Paper(id={self.id!r}, title={self.title!r}, chars={len(self.text)})"
@@ -0,0 +1,123 @@
+import os, hashlib, logging, shutil, tempfile, threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import BinaryIO, Optional, Union
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+class PaperCache:
+    """
+    논문 PDF 원본 / 추출 텍스트 디스크 캐시
+    (논문 id, URL) 해시로 저장, 용량 초과 시 LRU 삭제
+    """
+    KINDS = ('pdf', 'txt')
+
+    def __init__(self, root: Union[str, Path] = None, max_bytes: int = None):
+        self.root = Path(root or Config.PAPER_CACHE_DIR)
+        self.max_bytes = Config.PAPER_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+        self.root.mkdir(parents=True, exist_ok=True)
+
+        self.lock = threading.Lock()
+        self.entries: Optional[OrderedDict] = None   # path -> size (오래된 순)
+        self.total = 0
+
+    @staticmethod
+    def key(p_id: str, url: str) -> str:
+        return hashlib.sha256(f"{p_id}\n{url}".encode('utf-8')).hexdigest()
+
+    def path(self, key: str, kind: str) -> Path:
+        return self.root / key[:2] / f"{key}.{kind}"
+
+    def load_index(self):
+        """디스크 스캔으로 LRU 순서 복원 (최초 1회)"""
+        if self.entries is not None: return
+
+        files = []
+        for kind in self.KINDS:
+            for f in self.root.glob(f'*/*.{kind}'):
+                try:
+                    st = f.stat()
+                    files.append((st.st_mtime, str(f), st.st_size))
+                except OSError:
+                    continue
+
+        self.entries = OrderedDict((p, size) for _, p, size in sorted(files))
+        self.total = sum(self.entries.values())
+
+    def touch(self, path: Path) -> bool:
+        with self.lock:
+            self.load_index()
+            p = str(path)
+            if p not in self.entries:
+                if not path.exists(): return False
+                self.entries[p] = path.stat().st_size
+                self.total += self.entries[p]
+            self.entries.move_to_end(p)
+        try:
+            os.utime(path)
+        except OSError:
+            return False
+        return True
+
+    def get_text(self, key: str) -> Optional[str]:
+        """캐시된 추출 텍스트"""
+        path = self.path(key, 'txt')
+        if not self.touch(path): return None
+        try:
+            return path.read_text(encoding='utf-8')
+        except OSError:
+            return None
+
+    def get_pdf(self, key: str) -> Optional[Path]:
+        """캐시된 PDF 파일 경로"""
+        path = self.path(key, 'pdf')
+        return path if self.touch(path) else None
+
+    def put_text(self, key: str, text: str):
+        self.write(self.path(key, 'txt'), text.encode('utf-8'))
+
+    def put_pdf(self, key: str, data: Union[bytes, BinaryIO]) -> Optional[Path]:
+        path = self.path(key, 'pdf')
+        return path if self.write(path, data) else None
+
+    def write(self, path: Path, data: Union[bytes, BinaryIO]) -> bool:
+        """임시 파일에 쓴 뒤 rename으로 원자적 교체"""
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    if isinstance(data, (bytes, bytearray)):
+                        f.write(data)
+                    else:
+                        shutil.copyfileobj(data, f)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp, path)
+            except BaseException:
+                os.unlink(tmp)
+                raise
+        except OSError as e:
+            logger.warning(f"캐시 저장 실패 {path}: {e}")
+            return False
+
+        size = path.stat().st_size
+        with self.lock:
+            self.load_index()
+            p = str(path)
+            self.total += size - self.entries.pop(p, 0)
+            self.entries[p] = size
+            self.evict()
+        return True
+
+    def evict(self):
+        """용량 초과 시 가장 오래 사용되지 않은 파일부터 삭제 (lock 보유 상태에서 호출)"""
+        while self.total > self.max_bytes and len(self.entries) > 1:
+            p, size = self.entries.popitem(last=False)
+            self.total -= size
+            try:
+                os.unlink(p)
+                logger.info(f"캐시 삭제 (LRU): {p}")
+            except OSError:
+                pass
@@ -1,14 +1,65 @@
-import os, requests, logging, re, time, PyPDF2
-from bs4 import BeautifulSoup
-from typing import Dict, Optional
-from urllib.parse import urljoin
+import logging, shutil, tempfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import TYPE_CHECKING, BinaryIO, Dict, Iterator, List, Optional, Tuple, Union
+from config import Config
+from rate_limiter import HostLimiter
+from http_client import HttpClient, get_client
+from paper_library import PaperLibrary, get_library
+from paper_cache import PaperCache
+from paper import Paper
+from pdf_parser import PdfParsePool
+import pdf_parser
+import metrics
+
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
 
 logger = logging.getLogger(__name__)
 
 class Download:
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({'User-Agent': 'Academic-RAG-Bot/1.0 (non-commercial)'})
+    def __init__(self, limiter: Optional[HostLimiter] = None, max_workers: int = None,
+                 cache: Optional[PaperCache] = None, parser: Union[PdfParsePool, bool, None] = None,
+                 http: Optional[HttpClient] = None, library: Union[PaperLibrary, bool, None] = None):
+        self.max_workers = max_workers or Config.DOWNLOAD_WORKERS
+        # Search와 공유하는 HTTP 클라이언트 (limiter를 따로 주면 전용 클라이언트 생성)
+        self.http = http or (HttpClient(limiter=limiter) if limiter else get_client())
+        self.limiter = self.http.limiter
+        # 추출한 본문을 로컬 라이브러리에 보관 (다음 검색에서 다운로드 없이 사용, False면 사용 안 함)
+        self.library = (library if library is not None else get_library()) or None
+        self.cache = cache or PaperCache()
+        # PDF 파싱은 네트워크 스레드와 분리된 프로세스 풀에서 실행 (PDF_PARSE_WORKERS=0 또는 parser=False면 같은 프로세스)
+        self.parser = (parser if parser is not None else (PdfParsePool() if Config.PDF_PARSE_WORKERS != 0 else None)) or None
+
+    def close(self):
+        """PDF 파싱 풀 정리 (공유 HTTP 클라이언트는 닫지 않음)"""
+        if self.parser:
+            self.parser.shutdown()
+
+    def d_and_p_iter(self, ps: List[Dict], max_workers: int = None) -> Iterator[Tuple[int, Optional[Dict]]]:
+        """
+        여러 논문을 병렬로 다운로드 및 파싱
+        완료되는 순서대로 (입력 인덱스, 결과) 반환
+        """
+        if not ps: return
+        workers = min(max_workers or self.max_workers, len(ps))
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='download') as pool:
+            futures = {metrics.submit(pool, self.d_and_p, p): i for i, p in enumerate(ps)}
+            for f in as_completed(futures):
+                i = futures[f]
+                try:
+                    yield i, f.result()
+                except Exception as e:
+                    logger.error(f"'{ps[i].get('id', 'unknown')}' 처리 중 오류 발생: {e}")
+                    yield i, None
+
+    def d_and_p_many(self, ps: List[Dict], max_workers: int = None) -> List[Optional[Dict]]:
+        """여러 논문을 병렬로 다운로드 및 파싱 (입력 순서 유지)"""
+        results: List[Optional[Dict]] = [None] * len(ps)
+        for i, r in self.d_and_p_iter(ps, max_workers):
+            results[i] = r
+        return results
 
     def d_and_p(self, p_info: Dict) -> Optional[Dict]:
         """
@@ -18,82 +69,139 @@ class Download:
         p_id = p_info.get('id', 'unknown')
         logger.info(f"'{p_id}' 콘텐츠 추출 시작")
 
-        # pdf
-        if p_info.get('pdf_url'):
-            pdf_text = self.pdf_download(p_info.get('pdf_url'))
-            if pdf_text and len(pdf_text.strip()) > 500:
-                logger.info(f"✅ PDF에서 성공적으로 텍스트 추출 ({len(pdf_text)}자)")
-                return self.build_re(p_info, pdf_text, 'pdf')
+        with metrics.span('download.paper', id=p_id) as sp:
+            # 라이브러리에 저장된 본문 (PDF가 아니고 PDF 링크가 있으면 PDF 다시 시도)
+            stored, c_type = p_info.get('full_text'), p_info.get('content_type')
+            if stored and c_type and (c_type == 'pdf' or not p_info.get('pdf_url')):
+                logger.info(f"✅ 라이브러리에 저장된 본문 사용 ({c_type}, {len(stored)}자)")
+                sp.set(content_type=c_type, library=True)
+                return self.build_re(p_info, stored, c_type, store=False)
+
+            # pdf
+            if p_info.get('pdf_url'):
+                pdf_text = self.pdf_download(p_info.get('pdf_url'), p_id)
+                if pdf_text and len(pdf_text.strip()) > 500:
+                    logger.info(f"✅ PDF에서 성공적으로 텍스트 추출 ({len(pdf_text)}자)")
+                    sp.set(content_type='pdf')
+                    return self.build_re(p_info, pdf_text, 'pdf')
             
-        # web parse
-        if p_info.get('web_url'):
-            web_text = self.web_parse(p_info)
-            if web_text and len(web_text.strip()) > 200:
-                logger.info(f"✅ 웹페이지에서 성공적으로 텍스트 추출 ({len(web_text)}자)")
-                return self.build_re(p_info, web_text, 'web')            
+            # web parse (사이트 파서는 초록만 추출하므로 초록이 이미 있으면 생략)
+            abstract = p_info.get('abstract') or ''
+            if p_info.get('web_url') and len(abstract.strip()) < 200:
+                web_text = self.web_parse(p_info)
+                if web_text and len(web_text.strip()) > 200:
+                    logger.info(f"✅ 웹페이지에서 성공적으로 텍스트 추출 ({len(web_text)}자)")
+                    sp.set(content_type='web')
+                    return self.build_re(p_info, web_text, 'web')            
          
-        # Abstract
-        abstract = p_info.get('abstract', '')
-        if abstract and len(abstract.strip()) > 50:
-            logger.info(f"✅ 초록 텍스트 사용 ({len(abstract)}자)")
-            return self.build_re(p_info, abstract, 'abstract')   
-
-        logger.warning(f"{p_id}에서 유의미한 텍스트를 추출하지 못했습니다.")
-        return None
-
-    def pdf_download(self, pdf_url: Dict) -> Optional[str]:
-        """PDF 다운로드 및 텍스트 추출"""
-        time.sleep(1.5)
-        logger.info(f"PDF 다운로드 시도: {pdf_url}")
+            # Abstract
+            if abstract and len(abstract.strip()) > 50:
+                logger.info(f"✅ 초록 텍스트 사용 ({len(abstract)}자)")
+                sp.set(content_type='abstract')
+                return self.build_re(p_info, abstract, 'abstract')   
 
-        try:
-            res = self.session.get(pdf_url, stream=True, timeout=20)
-            res.raise_for_status()
-            
-            from io import BytesIO
-            pdf_file = BytesIO(res.content)
+            logger.warning(f"{p_id}에서 유의미한 텍스트를 추출하지 못했습니다.")
+            return None
 
-            pdf_reader = PyPDF2.PdfReader(pdf_file)
-            text_parts = [page.extract_text() for page in pdf_reader.pages]
+    def pdf_download(self, pdf_url: str, p_id: str = None) -> Optional[str]:
+        """PDF 다운로드 및 텍스트 추출 (캐시 우선)"""
+        key = self.cache.key(p_id or pdf_url, pdf_url)
 
-            full_text = "\n".join(filter(None, text_parts))
-            return self.clean(full_text)
+        cached = self.cache.get_text(key)
+        metrics.cache('paper_text', cached is not None)
+        if cached is not None:
+            logger.info(f"캐시된 PDF 텍스트 사용: {pdf_url}")
+            return cached
+
+        try:
+            pdf_path = self.cache.get_pdf(key)
+            metrics.cache('paper_pdf', pdf_path is not None)
+            if pdf_path is None:
+                with tempfile.TemporaryFile() as spool:
+                    with metrics.span('download.pdf_fetch'):
+                        if not self.fetch_pdf(pdf_url, spool):
+                            return None
+
+                    spool.seek(0)
+                    pdf_path = self.cache.put_pdf(key, spool)
+                    if pdf_path is None:
+                        spool.seek(0)
+                        text = self.parse_spool(spool)
+                        if text is not None:
+                            self.cache.put_text(key, text)
+                        return text
+            else:
+                logger.info(f"캐시된 PDF 파싱: {pdf_path}")
+
+            text = self.parse_pdf(pdf_path)
+            if text is None:
+                return None
+            self.cache.put_text(key, text)
+            return text
         except Exception as e:
             logging.error(f"PDF 처리 중 오류 발생 {pdf_url}: {e}")
             return None
 
-    def clean(sef, text: str) -> str:
-        """추출된 텍스트 정리"""
-        if not text:  return ""
-        
-        text = re.sub(r'\s*\n\s*', '\n', text)
-        text = re.sub(r'[ \t]+', ' ', text)
+    def parse_pdf(self, pdf_path) -> Optional[str]:
+        """저장된 PDF 파싱 (프로세스 풀 사용 시 문서별 timeout 적용)"""
+        with metrics.span('download.pdf_parse'):
+            if self.parser:
+                return self.parser.parse(pdf_path)
+            with open(pdf_path, 'rb') as f:
+                return pdf_parser.extract_pdf(f)
 
-        return text.strip()
-    
-    def save(self, temp_path: str, p_id:str):
-        """PDF 저장"""
+    def parse_spool(self, spool: BinaryIO) -> Optional[str]:
+        """캐시에 저장하지 못한 PDF를 임시 파일로 옮겨 파싱 (같은 timeout 적용, 실패 시 None -> web / abstract)"""
         try:
-            name = self.filename(p_id)
-            path = self.papers_dir / f"{name}.pdf"
+            with tempfile.TemporaryDirectory(prefix='pdf-') as d:
+                path = Path(d) / 'paper.pdf'
+                with open(path, 'wb') as f:
+                    shutil.copyfileobj(spool, f)
+                return self.parse_pdf(path)
+        except OSError as e:
+            logger.warning(f"PDF 임시 파일 저장 실패, 다른 경로로 추출: {e}")
+            return None
 
-            import shutil
-            shutil.copy2(temp_path, path)
-            logger.info(f"PDF 저장 완료: {path}")
+    def fetch_pdf(self, pdf_url: str, out: BinaryIO, max_bytes: int = None) -> bool:
+        """
+        PDF를 메모리에 올리지 않고 파일로 스트리밍 저장
+        Content-Length 또는 누적 크기가 max_bytes를 넘으면 중단
+        """
+        max_bytes = max_bytes or Config.PDF_MAX_BYTES
+        logger.info(f"PDF 다운로드 시도: {pdf_url}")
 
-        except Exception as e:
-            logger.warning(f"PDF 저장 실퍠: {e}")
+        with self.http.stream(pdf_url, timeout=20) as res:
+            res.raise_for_status()
+
+            length = res.headers.get('Content-Length')
+            if length and length.isdigit() and int(length) > max_bytes:
+                logger.warning(f"PDF 크기 초과로 건너뜀 ({int(length)} > {max_bytes} bytes): {pdf_url}")
+                return False
+
+            total = 0
+            for chunk in res.iter_content(chunk_size=64 * 1024):
+                total += len(chunk)
+                if total > max_bytes:
+                    logger.warning(f"PDF 다운로드 중 크기 초과로 중단 (> {max_bytes} bytes): {pdf_url}")
+                    return False
+                out.write(chunk)
 
+        return total > 0
+
+    def clean(self, text: str) -> str:
+        """추출된 텍스트 정리"""
+        return pdf_parser.clean(text)
+    
     def web_parse(self, p_info: Dict) -> Optional[str]:
         """웹페이지에서 텍스트 추출"""
         web_url = p_info.get('web_url')
         if not web_url: return None
-        time.sleep(1.5)
         logger.info(f"웹페이지 파싱 시도:{web_url}")
 
         try:
-            res = self.session.get(web_url, timeout=20)
+            res = self.http.get(web_url, timeout=20)
             res.raise_for_status()
+            from bs4 import BeautifulSoup
             soup = BeautifulSoup(res.content, 'html.parser')
             
             source = p_info.get('source', '').lower()
@@ -113,17 +221,20 @@ class Download:
             logging.error(f"웹페이지 파싱 오류 {web_url}: {e}")
             return None
  
-    def parse_pubmed(self, soup:BeautifulSoup) -> Optional[str]:
+    def parse_pubmed(self, soup: 'BeautifulSoup') -> Optional[str]:
         content = soup.select_one('div.abstract-content, div#abstract')
         return content.get_text(separator='\n') if content else ''
 
-    def parse_arxiv(self, soup:BeautifulSoup) -> Optional[str]:
+    def parse_arxiv(self, soup: 'BeautifulSoup') -> Optional[str]:
         content = soup.select_one('blockquote.abstract')
         return content.get_text(separator='\n') if content else ''
     
-    def build_re(self, p_info: Dict, text: str, type:str) -> Dict:
-        p_info['full_text'] = text
-        p_info['content_type'] = type
-        p_info['text_length'] = len(text)
-        p_info['summary'] = text[:500] + '...' if len(text) > 500 else text
-        return p_info
+    def build_re(self, p_info: Dict, text: str, type:str, store: bool = True) -> Paper:
+        """검색 결과 + 추출 본문 -> Paper (summary / text_length는 본문에서 파생)"""
+        p = Paper.from_dict(p_info, text, type)
+        if store and self.library is not None:
+            try:
+                self.library.add(p)
+            except Exception as e:
+                logger.warning(f"라이브러리 저장 실패 {p.get('id')}: {e}")
+        return p
@@ -0,0 +1,157 @@
+"""
+로컬 논문 라이브러리 (SQLite + FTS5)
+한 번 수집한 논문의 메타데이터 / 정제 본문 / 추출 경로(pdf, web, abstract)를 보관하고
+Search가 외부 API보다 먼저 조회
+"""
+import re, json, time, sqlite3, logging, threading
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+from config import Config
+from search.dedup import identifiers
+
+logger = logging.getLogger(__name__)
+
+TOKEN_RE = re.compile(r'\w+')
+FIELDS = ('id', 'source', 'title', 'abstract', 'year', 'doi', 'pmc_id', 'pdf_url', 'web_url')
+CONTENT_RANK = {'abstract': 1, 'web': 2, 'pdf': 3}
+
+def library_key(p: Dict) -> str:
+    """정규화 식별자 우선 (arXiv 버전 / 소스가 달라도 같은 키)"""
+    ids = dict(k for k in identifiers(p) if k[0] != 'title')
+    for kind in ('arxiv', 'doi', 'pmid', 'pmc'):
+        if kind in ids:
+            return f"{kind}:{ids[kind]}"
+    return f"{p.get('source', '')}:{p.get('id', '')}"
+
+def fts_query(q: str, op: str = 'AND') -> Optional[str]:
+    """검색 구문 -> FTS5 MATCH 식 (단어를 따옴표로 감싸 연산자 해석 방지)"""
+    words = list(dict.fromkeys(w for w in TOKEN_RE.findall(q.lower()) if len(w) > 1))
+    if not words: return None
+    return f' {op} '.join(f'"{w}"' for w in words)
+
+class PaperLibrary:
+    def __init__(self, path: Union[str, Path] = None):
+        path = Path(path or Config.LIBRARY_DB)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.lock = threading.Lock()
+
+        self.conn = sqlite3.connect(str(path), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        # FTS5 외부 콘텐츠 테이블은 rowid로 연결되므로 rowid를 명시 (VACUUM에도 번호 유지)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS papers (
+                rowid INTEGER PRIMARY KEY, key TEXT NOT NULL UNIQUE, id TEXT, source TEXT, title TEXT, authors TEXT, abstract TEXT,
+                year TEXT, doi TEXT, pmc_id TEXT, pdf_url TEXT, web_url TEXT,
+                content_type TEXT, text TEXT, added REAL NOT NULL, updated REAL NOT NULL
+            );
+            CREATE VIRTUAL TABLE IF NOT EXISTS papers_fts USING fts5(
+                title, abstract, text, content='papers', content_rowid='rowid'
+            );
+            CREATE TRIGGER IF NOT EXISTS papers_ai AFTER INSERT ON papers BEGIN
+                INSERT INTO papers_fts(rowid, title, abstract, text) VALUES (new.rowid, new.title, new.abstract, new.text);
+            END;
+            CREATE TRIGGER IF NOT EXISTS papers_ad AFTER DELETE ON papers BEGIN
+                INSERT INTO papers_fts(papers_fts, rowid, title, abstract, text) VALUES ('delete', old.rowid, old.title, old.abstract, old.text);
+            END;
+            CREATE TRIGGER IF NOT EXISTS papers_au AFTER UPDATE ON papers BEGIN
+                INSERT INTO papers_fts(papers_fts, rowid, title, abstract, text) VALUES ('delete', old.rowid, old.title, old.abstract, old.text);
+                INSERT INTO papers_fts(rowid, title, abstract, text) VALUES (new.rowid, new.title, new.abstract, new.text);
+            END;
+            CREATE TABLE IF NOT EXISTS refreshed (q TEXT PRIMARY KEY, at REAL NOT NULL);
+        """)
+        self.conn.commit()
+
+    def count(self) -> int:
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM papers").fetchone()[0]
+
+    def add(self, p: Dict, text: str = None, content_type: str = None) -> bool:
+        """
+        논문 저장 (본문이 없으면 메타데이터 / 초록만)
+        이미 있으면 기존보다 좋은 추출 경로(pdf > web > abstract)의 본문일 때만 교체
+        """
+        key = library_key(p)
+        text = p.get('clean_text') or p.get('full_text') if text is None else text
+        content_type = content_type or p.get('content_type') or ('abstract' if text else None)
+        now = time.time()
+        row = {k: (str(p.get(k)) if p.get(k) is not None else None) for k in FIELDS}
+
+        with self.lock:
+            old = self.conn.execute("SELECT content_type FROM papers WHERE key = ?", (key,)).fetchone()
+            if old is None:
+                self.conn.execute(
+                    "INSERT INTO papers (key, id, source, title, authors, abstract, year, doi, pmc_id, pdf_url, web_url,"
+                    " content_type, text, added, updated) VALUES (:key, :id, :source, :title, :authors, :abstract, :year,"
+                    " :doi, :pmc_id, :pdf_url, :web_url, :content_type, :text, :now, :now)",
+                    dict(row, key=key, authors=json.dumps(p.get('authors') or [], ensure_ascii=False),
+                         content_type=content_type, text=text, now=now)
+                )
+            elif text and CONTENT_RANK.get(content_type, 0) > CONTENT_RANK.get(old[0], 0):
+                self.conn.execute(
+                    "UPDATE papers SET content_type = ?, text = ?, pdf_url = COALESCE(?, pdf_url), updated = ? WHERE key = ?",
+                    (content_type, text, row['pdf_url'], now, key)
+                )
+            else:
+                self.conn.commit()
+                return False
+            self.conn.commit()
+        return True
+
+    def search(self, q: str, n: int = 15, op: str = 'AND') -> List[Dict]:
+        """FTS5 bm25 순위 (제목 > 초록 > 본문 가중치), 검색 결과 dict 형태 + 'full_text' / 'content_type'"""
+        match = fts_query(q, op)
+        if not match: return []
+
+        with self.lock:
+            try:
+                rows = self.conn.execute(
+                    "SELECT p.id, p.source, p.title, p.abstract, p.year, p.doi, p.pmc_id, p.pdf_url, p.web_url,"
+                    " p.authors, p.content_type, p.text, bm25(papers_fts, 10.0, 4.0, 1.0) AS score"
+                    " FROM papers_fts JOIN papers p ON p.rowid = papers_fts.rowid"
+                    " WHERE papers_fts MATCH ? ORDER BY score LIMIT ?",
+                    (match, n)
+                ).fetchall()
+            except sqlite3.OperationalError as e:
+                logger.warning(f"라이브러리 검색 실패 ({match}): {e}")
+                return []
+
+        ps = []
+        for r in rows:
+            p = dict(zip(FIELDS, r[:9]))
+            p.update(authors=json.loads(r[9] or '[]'), content_type=r[10], full_text=r[11] or None,
+                     library_score=-r[12], library=True)
+            ps.append(p)
+        return ps
+
+    def needs_refresh(self, q: str, interval: float = None) -> bool:
+        """검색 구문을 마지막으로 외부에서 갱신한 지 interval 초가 지났는지"""
+        interval = Config.LIBRARY_REFRESH_INTERVAL if interval is None else interval
+        with self.lock:
+            row = self.conn.execute("SELECT at FROM refreshed WHERE q = ?", (q,)).fetchone()
+        return row is None or time.time() - row[0] >= interval
+
+    def mark_refreshed(self, q: str):
+        """갱신 성공 시각 기록"""
+        with self.lock:
+            self.conn.execute("INSERT OR REPLACE INTO refreshed VALUES (?, ?)", (q, time.time()))
+            self.conn.commit()
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+_library = None
+_lock = threading.Lock()
+
+def get_library() -> Optional[PaperLibrary]:
+    """프로세스 공유 라이브러리 (USE_LIBRARY=0이거나 FTS5를 쓸 수 없으면 None)"""
+    global _library
+    if _library is None and Config.USE_LIBRARY:
+        with _lock:
+            if _library is None:
+                try:
+                    _library = PaperLibrary()
+                except sqlite3.OperationalError as e:
+                    logger.warning(f"로컬 라이브러리 사용 불가: {e}")
+                    Config.USE_LIBRARY = False
+    return _library
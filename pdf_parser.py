@@ -0,0 +1,131 @@
+import os, re, logging, signal, threading, multiprocessing
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from typing import BinaryIO, Optional, Tuple
+from config import Config
+import metrics
+
+logger = logging.getLogger(__name__)
+
+def clean(text: str) -> str:
+    """추출된 텍스트 정리"""
+    if not text:  return ""
+
+    text = re.sub(r'\s*\n\s*', '\n', text)
+    text = re.sub(r'[ \t]+', ' ', text)
+
+    return text.strip()
+
+def extract_pdf(source: BinaryIO, char_budget: int = None) -> str:
+    """
+    PDF 파일 객체에서 페이지 단위로 텍스트 추출
+    누적 글자 수가 char_budget에 도달하면 나머지 페이지는 읽지 않음
+    """
+    text, pages = extract_pdf_pages(source, char_budget)
+    metrics.count('rag_pdf_pages_parsed_total', pages, trace_key='pdf.pages')
+    return text
+
+def extract_pdf_pages(source: BinaryIO, char_budget: int = None) -> Tuple[str, int]:
+    """extract_pdf와 같되 (텍스트, 읽은 페이지 수) 반환"""
+    import PyPDF2
+
+    char_budget = char_budget or Config.PDF_CHAR_BUDGET
+    pdf_reader = PyPDF2.PdfReader(source)
+
+    text_parts, total, pages = [], 0, 0
+    for page in pdf_reader.pages:
+        pages += 1
+        t = page.extract_text()
+        if not t: continue
+        text_parts.append(t)
+        total += len(t)
+        if total >= char_budget:
+            logger.info(f"글자 수 한도 도달 ({total}/{char_budget}자), 나머지 페이지 생략")
+            break
+
+    full_text = "\n".join(text_parts)
+    return clean(full_text)[:char_budget], pages
+
+def _timeout(signum, frame):
+    raise TimeoutError("PDF 파싱 시간 초과")
+
+def extract_file(path: str, char_budget: int = None, timeout: float = None) -> Tuple[str, int]:
+    """워커 프로세스용: 파일 경로에서 (텍스트, 페이지 수) 추출, timeout 초과 시 SIGALRM으로 중단"""
+    use_alarm = timeout and hasattr(signal, 'setitimer') and threading.current_thread() is threading.main_thread()
+    if use_alarm:
+        signal.signal(signal.SIGALRM, _timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        with open(path, 'rb') as f:
+            return extract_pdf_pages(f, char_budget)
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+class PdfParsePool:
+    """
+    PDF 텍스트 추출 전용 프로세스 풀
+    문서별 timeout 적용, 응답 없는 워커는 풀을 재시작하여 종료
+    """
+    def __init__(self, max_workers: int = None, timeout: float = None):
+        self.max_workers = max_workers or Config.PDF_PARSE_WORKERS or os.cpu_count() or 1
+        self.timeout = timeout or Config.PDF_PARSE_TIMEOUT
+        self.pool: Optional[ProcessPoolExecutor] = None
+        self.pending = 0
+        self.lock = threading.Lock()
+
+    def executor(self) -> ProcessPoolExecutor:
+        with self.lock:
+            if self.pool is None:
+                self.pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+            return self.pool
+
+    def parse(self, path: str, char_budget: int = None) -> Optional[str]:
+        """PDF 파일 파싱 (실패/시간 초과 시 None)"""
+        pool = self.executor()
+        with self.lock:
+            self.pending += 1
+            waves = self.pending // self.max_workers + 1
+
+        try:
+            future = pool.submit(extract_file, str(path), char_budget, self.timeout)
+            # 워커 내부 SIGALRM이 1차 방어선, 대기열 시간을 고려한 여유 후 풀 재시작
+            text, pages = future.result(timeout=self.timeout * waves + 5)
+            metrics.count('rag_pdf_pages_parsed_total', pages, trace_key='pdf.pages')
+            return text
+        except FutureTimeout:
+            logger.error(f"PDF 파싱 응답 없음, 프로세스 풀 재시작: {path}")
+            self.restart(pool)
+            return None
+        except Exception as e:
+            logger.error(f"PDF 파싱 실패 {path}: {e}")
+            return None
+        finally:
+            with self.lock:
+                self.pending -= 1
+
+    def restart(self, pool: ProcessPoolExecutor):
+        """워커를 모두 종료하고 다음 요청에서 새 풀 생성 (진행 중이던 다른 파싱도 실패 처리됨)"""
+        with self.lock:
+            if self.pool is not pool: return
+            self.pool = None
+            collateral = self.pending - 1
+
+        if collateral > 0:
+            logger.warning(f"프로세스 풀 재시작으로 진행 / 대기 중이던 PDF 파싱 {collateral}건 함께 중단")
+            metrics.count('rag_pdf_parse_aborted_total', collateral)
+
+        for p in list((getattr(pool, '_processes', None) or {}).values()):
+            try:
+                p.kill()
+            except Exception:
+                pass
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self):
+        with self.lock:
+            pool, self.pool = self.pool, None
+        if pool:
+            pool.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,215 @@
+import time, queue, logging, threading, contextvars
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List
+from config import Config
+from search.intent_module import Intent
+from search.paper_search import Search
+from paper_download import Download
+from text_processor import tProcessor
+from llm_processor import LLMProcessor
+from context_compressor import compress
+import metrics
+
+logger = logging.getLogger(__name__)
+
+DONE = object()
+
+def doc_info(p: Dict) -> Dict:
+    """응답용 문헌 요약 정보"""
+    return {
+        'id': p.get('id'),
+        'title': p.get('title'),
+        'source': p.get('source'),
+        'content_type': p.get('content_type'),
+        'relevance_score': float(p.get('relevance_score') or 0.0),
+        'web_url': p.get('web_url'),
+    }
+
+class Pipeline:
+    """
+    질문 -> 답변 파이프라인
+    다운로드 -> 정제/채점 -> 수집 단계를 크기 제한 큐로 연결해 겹쳐 실행하고,
+    관련도 기준을 넘는 문헌이 충분히 모이면 남은 다운로드를 취소
+    """
+    def __init__(self, intent: Intent = None, search: Search = None, downloader: Download = None,
+                 processor: tProcessor = None, llm: LLMProcessor = None):
+        self.intent = intent or Intent()
+        self.search = search or Search()
+        self.downloader = downloader or Download()
+        self.processor = processor or tProcessor()
+        self.llm = llm or LLMProcessor()
+
+    def prepare(self, question: str, top_k: int = 5) -> Dict:
+        """질문 분석 -> 검색 -> 수집 -> 재순위 (LLM 호출 전 단계)"""
+        timings = {}
+        start = time.perf_counter()
+
+        with metrics.span('intent.analyze'):
+            analysis = self.intent.analyze(question)
+        timings['analysis'] = round(time.perf_counter() - start, 3)
+
+        with metrics.span('search') as sp:
+            found = self.search.search_all_status(analysis['keywords'], query=analysis['query'])
+            sp.set(found=len(found['papers']))
+        timings['search'] = found['elapsed']
+
+        # 한국어 질문과 영어 검색 구문을 함께 사용 (영어 문헌의 희소 점수가 0이 되지 않도록)
+        rank_q = f"{question} {analysis['query']}"
+
+        # 요청별 배치 상태는 분리하고 인덱스/임베딩 모델만 공유
+        processor = self.processor.fork()
+
+        t = time.perf_counter()
+        with metrics.span('collect') as sp:
+            papers = self.collect(rank_q, found['papers'], top_k, timings, processor=processor)
+            sp.set(collected=len(papers))
+        timings['collect'] = round(time.perf_counter() - t, 3)
+
+        t = time.perf_counter()
+        relevant = []
+        if papers:
+            with metrics.span('text.process_doc', docs=len(papers)):
+                processor.process_doc(papers)
+            with metrics.span('text.rel_doc'):
+                relevant = processor.rel_doc(rank_q, top_k=top_k)
+            if Config.USE_COMPRESSION:
+                with metrics.span('context.compress'):
+                    compress(rank_q, relevant)
+        timings['rank'] = round(time.perf_counter() - t, 3)
+
+        return {
+            'question': question,
+            'analysis': analysis,
+            'search': found['sources'],
+            'found': len(found['papers']),
+            'collected': len(papers),
+            'papers': relevant,
+            'timings': timings,
+            'started': start
+        }
+
+    def run(self, question: str, top_k: int = 5) -> Dict:
+        """전체 실행 후 답변 / 출처 / 단계별 시간 (계측 사용 시 요청 기록 'trace') 반환"""
+        with metrics.trace('pipeline') as tr:
+            res = self.prepare(question, top_k)
+
+            t = time.perf_counter()
+            answer = self.llm.gen_res(question, res['papers'])
+            res['timings']['llm'] = round(time.perf_counter() - t, 3)
+            res['timings']['total'] = round(time.perf_counter() - res.pop('started'), 3)
+
+        res.update(answer)
+        if tr is not None:
+            res['trace'] = tr.to_dict()
+        logger.info(f"파이프라인 완료: {res['timings']}")
+        return res
+
+    def stream(self, question: str, top_k: int = 5) -> Iterator[Dict]:
+        """
+        스트리밍 실행
+        이벤트 순서: analysis -> search -> (gen_res_stream의 sources / token / done)
+        계측 사용 시 done 이벤트에 요청 기록 'trace' 포함
+        """
+        with metrics.trace('pipeline') as tr:
+            res = self.prepare(question, top_k)
+            yield {'type': 'analysis', 'analysis': res['analysis']}
+            yield {'type': 'search', 'sources': res['search'], 'found': res['found'], 'collected': res['collected']}
+
+            t = time.perf_counter()
+            for event in self.llm.gen_res_stream(question, res['papers']):
+                if event['type'] == 'done':
+                    metrics.observe('rag_stage_duration_seconds', time.perf_counter() - t, stage='llm.generate')
+                    event['timings'] = dict(res['timings'], total=round(time.perf_counter() - res['started'], 3))
+                    if tr is not None:
+                        event['trace'] = tr.to_dict()
+                yield event
+
+    def collect(self, q: str, papers: List[Dict], top_k: int = 5, timings: Dict = None,
+                enough: int = None, threshold: float = None, processor: tProcessor = None) -> List[Dict]:
+        """
+        다운로드와 정제/채점을 겹쳐 실행
+        threshold 이상인 문헌이 enough개 모이면 아직 시작하지 않은 다운로드 취소
+        """
+        if not papers: return []
+        enough = enough or max(Config.PIPELINE_ENOUGH_DOCS, top_k)
+        threshold = Config.PIPELINE_SCORE_THRESHOLD if threshold is None else threshold
+        timings = {} if timings is None else timings
+        processor = processor or self.processor
+
+        start = time.perf_counter()
+        stop = threading.Event()
+        fetched = queue.Queue(maxsize=Config.PIPELINE_QUEUE_SIZE)
+        scored = queue.Queue(maxsize=Config.PIPELINE_QUEUE_SIZE)
+        remaining = [len(papers)]
+        lock = threading.Lock()
+
+        def put(q_: queue.Queue, item) -> bool:
+            while not stop.is_set():
+                try:
+                    q_.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def on_done(f):
+            r = None if f.cancelled() or f.exception() else f.result()
+            if r is not None:
+                put(fetched, r)
+            with lock:
+                remaining[0] -= 1
+                last = remaining[0] == 0
+            if last:
+                put(fetched, DONE)
+
+        def process_stage():
+            while not stop.is_set():
+                try:
+                    p = fetched.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                if p is DONE:
+                    put(scored, DONE)
+                    return
+                try:
+                    score = processor.score_doc(q, p)
+                except Exception as e:
+                    logger.warning(f"'{p.get('id')}' 채점 실패: {e}")
+                    score = None
+                if score is not None:
+                    put(scored, (p, score))
+
+        pool = ThreadPoolExecutor(max_workers=min(self.downloader.max_workers, len(papers)), thread_name_prefix='pipeline')
+        futures = [metrics.submit(pool, self.downloader.d_and_p, p) for p in papers]
+        for f in futures:
+            f.add_done_callback(on_done)
+
+        worker = threading.Thread(target=contextvars.copy_context().run, args=(process_stage,),
+                                  name='pipeline-process', daemon=True)
+        worker.start()
+
+        collected, good = [], 0
+        try:
+            while True:
+                item = scored.get()
+                if item is DONE: break
+
+                p, score = item
+                collected.append(p)
+                if 'first_doc' not in timings:
+                    timings['first_doc'] = round(time.perf_counter() - start, 3)
+
+                if score >= threshold:
+                    good += 1
+                    if good >= enough:
+                        # cancel()은 on_done을 이 스레드에서 바로 실행하므로, 가득 찬 큐에서 기다리지 않도록 먼저 중단 표시
+                        stop.set()
+                        cancelled = sum(f.cancel() for f in futures)
+                        logger.info(f"관련 문헌 {good}개 확보, 남은 다운로드 {cancelled}개 취소")
+                        break
+        finally:
+            stop.set()
+            pool.shutdown(wait=False, cancel_futures=True)
+
+        logger.info(f"{len(papers)}개 중 {len(collected)}개 수집 (기준 통과 {good}개)")
+        return collected
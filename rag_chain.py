@@ -1,14 +1,8 @@
+import threading
 from typing import List, Dict
 
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.runnables import RunnablePassthrough
-from langchain_core.output_parsers import StrOutputParser
-from langchain_google_genai import ChatGoogleGenerativeAI
-
 from config import Config
 
-llm = ChatGoogleGenerativeAI(model=Config.DEFAULT_MODEL, temperature=0.1)
-
 prompt_t = """
 당신은 주어진 학술 문헌들을 분석하고 핵심 내용을 요약하는 전문 연구 분석가입니다.
 아래 '문헌 정보'만을 근거로 하여, 사용자의 '질문'에 대한 답변을 다음 형식에 맞춰 한국어로 생성해 주세요.
@@ -34,25 +28,52 @@ prompt_t = """
 [답변]
 """
 
-prompt = ChatPromptTemplate.from_template(prompt_t)
-
 def format_doc(doc:List[Dict]) -> str:
     format_str = []
     for i, d in enumerate(doc, 1):
-        doc_con = d.get('clean_text') or d.get('summary', '내용 없음')
-        content_sni = doc_con[:3000]
-
         format = f"[출처 {i}]\n"
         format += f"제목: {d.get('title', '제목 없음')}\n"
-        format += f"요약: {content_sni}..."
+
+        if d.get('context'):
+            format += "발췌:\n" + d['context']
+        elif d.get('passages'):
+            format += "발췌:\n" + "\n...\n".join(p['text'] for p in d['passages'])
+        else:
+            doc_con = d.get('clean_text') or d.get('summary', '내용 없음')
+            content_sni = doc_con[:3000]
+            format += f"요약: {content_sni}..."
 
         format_str.append(format)
 
     return "\n\n".join(format_str)
 
-rag_chain = (
-    {"context": RunnablePassthrough(), "question": RunnablePassthrough()}
-    | prompt
-    | llm
-    | StrOutputParser()
-)
\ No newline at end of file
+_chain = None
+_lock = threading.Lock()
+
+def get_chain():
+    """RAG 체인 (최초 사용 시 LangChain / Gemini 클라이언트 생성)"""
+    global _chain
+    if _chain is None:
+        with _lock:
+            if _chain is None:
+                from langchain_core.prompts import ChatPromptTemplate
+                from langchain_core.runnables import RunnablePassthrough
+                from langchain_core.output_parsers import StrOutputParser
+                from langchain_google_genai import ChatGoogleGenerativeAI
+
+                llm = ChatGoogleGenerativeAI(model=Config.DEFAULT_MODEL, temperature=0.1)
+                prompt = ChatPromptTemplate.from_template(prompt_t)
+
+                _chain = (
+                    {"context": RunnablePassthrough(), "question": RunnablePassthrough()}
+                    | prompt
+                    | llm
+                    | StrOutputParser()
+                )
+    return _chain
+
+def __getattr__(name: str):
+    # 기존 `from rag_chain import rag_chain` 호환
+    if name == 'rag_chain':
+        return get_chain()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
@@ -0,0 +1,56 @@
+import threading, time
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse
+from config import Config
+
+class TokenBucket:
+    """토큰 버킷 (초당 rate개 충전, 최대 burst개 보관)"""
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = max(int(burst), 1)
+        self.tokens = float(self.burst)
+        self.stamp = time.monotonic()
+        self.lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """토큰 1개 예약 후 대기해야 할 시간(초) 반환"""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.stamp) * self.rate)
+            self.stamp = now
+            self.tokens -= 1
+
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def acquire(self):
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+class HostLimiter:
+    """호스트별 토큰 버킷 관리 (서브도메인은 상위 도메인 버킷 공유)"""
+    def __init__(self, limits: Optional[Dict[str, Tuple[float, int]]] = None, default: Optional[Tuple[float, int]] = None):
+        self.limits = Config.HOST_RATE_LIMITS if limits is None else limits
+        self.default = default or Config.DEFAULT_HOST_RATE
+        self.buckets: Dict[str, TokenBucket] = {}
+        self.lock = threading.Lock()
+
+    def match(self, host: str) -> Tuple[str, Tuple[float, int]]:
+        for pattern, rate in self.limits.items():
+            if host == pattern or host.endswith('.' + pattern):
+                return pattern, rate
+        return host, self.default
+
+    def bucket(self, url: str) -> TokenBucket:
+        host = (urlparse(url).hostname or '').lower()
+        key, rate = self.match(host)
+
+        with self.lock:
+            b = self.buckets.get(key)
+            if b is None:
+                b = self.buckets[key] = TokenBucket(*rate)
+        return b
+
+    def wait(self, url: str):
+        """해당 호스트에 요청을 보낼 수 있을 때까지 대기"""
+        self.bucket(url).acquire()
@@ -0,0 +1,130 @@
+import re, logging
+from functools import lru_cache
+import numpy as np
+import scipy.sparse as sp
+from typing import Dict, Iterable, List, Sequence, Tuple
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+TOKEN_RE = re.compile(r'[가-힣]+|[a-z0-9]+')
+
+@lru_cache(maxsize=1)
+def stop_words() -> frozenset:
+    """영어 불용어 (scikit-learn은 최초 사용 시 import)"""
+    from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
+    return frozenset(ENGLISH_STOP_WORDS)
+
+def tokenize(text: str) -> List[str]:
+    """
+    BM25용 토큰화
+    영문/숫자는 단어 단위, 한글은 어절 + 음절 bigram (조사가 붙어도 매칭되도록)
+    """
+    stop = stop_words()
+    tokens = []
+    for t in TOKEN_RE.findall(text.lower()):
+        if '가' <= t[0] <= '힣':
+            tokens.append(t)
+            if len(t) > 2:
+                tokens.extend(t[i:i + 2] for i in range(len(t) - 1))
+        elif len(t) > 1 and t not in stop:
+            tokens.append(t)
+    return tokens
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """점수 상위 k개 인덱스 (전체 정렬 없이 argpartition 후 k개만 정렬)"""
+    n = scores.shape[0]
+    if n == 0 or k <= 0:
+        return np.empty(0, dtype=np.int64)
+    if k < n:
+        idx = np.argpartition(-scores, k - 1)[:k]
+    else:
+        idx = np.arange(n)
+    return idx[np.argsort(-scores[idx], kind='stable')]
+
+def rrf(rankings: Iterable[Sequence[str]], k: int = None) -> List[Tuple[str, float]]:
+    """Reciprocal Rank Fusion: score(d) = Σ 1 / (k + rank)"""
+    k = k or Config.RRF_K
+    fused: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, d in enumerate(ranking, 1):
+            fused[d] = fused.get(d, 0.0) + 1.0 / (k + rank)
+    return sorted(fused.items(), key=lambda x: -x[1])
+
+class BM25Index:
+    """
+    scipy 희소 행렬 기반 BM25 역색인
+    열(단어)별로 BM25 가중치를 미리 계산해 두고, 질의 시 해당 열만 합산
+    """
+    def __init__(self, k1: float = None, b: float = None):
+        self.k1 = Config.BM25_K1 if k1 is None else k1
+        self.b = Config.BM25_B if b is None else b
+        self.ids: List[str] = []
+        self.vocab: Dict[str, int] = {}
+        self.weights = sp.csc_matrix((0, 0), dtype=np.float32)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def build(self, ids: List[str], texts: List[str]) -> 'BM25Index':
+        self.ids = list(ids)
+        self.vocab = {}
+        rows, cols, data = [], [], []
+
+        for r, text in enumerate(texts):
+            counts: Dict[int, int] = {}
+            for t in tokenize(text):
+                c = self.vocab.setdefault(t, len(self.vocab))
+                counts[c] = counts.get(c, 0) + 1
+            rows.extend([r] * len(counts))
+            cols.extend(counts.keys())
+            data.extend(counts.values())
+
+        n = len(self.ids)
+        tf = sp.csr_matrix(
+            (np.asarray(data, dtype=np.float32), (np.asarray(rows, dtype=np.int64), np.asarray(cols, dtype=np.int64))),
+            shape=(n, len(self.vocab))
+        )
+        if n == 0:
+            self.weights = tf.tocsc()
+            return self
+
+        dl = np.asarray(tf.sum(axis=1)).ravel()
+        avgdl = dl.mean() or 1.0
+        df = np.bincount(tf.indices, minlength=len(self.vocab))
+        idf = np.log1p((n - df + 0.5) / (df + 0.5)).astype(np.float32)
+
+        # tf * (k1 + 1) / (tf + k1 * (1 - b + b * dl / avgdl)) * idf
+        norm = self.k1 * (1 - self.b + self.b * dl / avgdl)
+        row_norm = np.repeat(norm, np.diff(tf.indptr)).astype(np.float32)
+        tf.data = tf.data * (self.k1 + 1) / (tf.data + row_norm) * idf[tf.indices]
+
+        self.weights = tf.tocsc()
+        return self
+
+    def scores(self, q: str) -> np.ndarray:
+        """모든 문서의 BM25 점수"""
+        out = np.zeros(len(self.ids), dtype=np.float32)
+        for t, cnt in self.count(q).items():
+            c = self.vocab.get(t)
+            if c is None: continue
+            start, end = self.weights.indptr[c], self.weights.indptr[c + 1]
+            out[self.weights.indices[start:end]] += cnt * self.weights.data[start:end]
+        return out
+
+    def count(self, q: str) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for t in tokenize(q):
+            counts[t] = counts.get(t, 0) + 1
+        return counts
+
+    def search(self, q: str, k: int = 10) -> List[Tuple[str, float]]:
+        s = self.scores(q)
+        return [(self.ids[i], float(s[i])) for i in top_k(s, k) if s[i] > 0]
+
+def dense_search(matrix: np.ndarray, ids: List[str], q_vec: np.ndarray, k: int = 10) -> List[Tuple[str, float]]:
+    """정규화된 임베딩 행렬과 질의 벡터의 내적(코사인) 상위 k개"""
+    if matrix is None or not len(ids):
+        return []
+    s = matrix @ q_vec
+    return [(ids[i], float(s[i])) for i in top_k(s, k)]
@@ -0,0 +1,188 @@
+"""
+소스 간 중복 논문 제거
+1) 정규화한 식별자(DOI, 버전 없는 arXiv id, PMID, PMCID, 제목) 일치
+2) 제목+초록 단어 shingle의 MinHash LSH로 거의 같은 문헌 탐지
+묶인 문헌은 전문(PDF)을 받을 수 있는 레코드를 기준으로 하나로 병합
+"""
+import re, zlib, logging
+import numpy as np
+from typing import Dict, List, Optional, Set, Tuple
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+PRIME = np.uint64((1 << 32) + 15)      # 2^32보다 큰 최소 소수
+WORD_RE = re.compile(r'[a-z0-9가-힣]+')
+ARXIV_DOI_RE = re.compile(r'^10\.48550/arxiv\.(.+)$')
+
+def norm_doi(doi: Optional[str]) -> Optional[str]:
+    if not doi: return None
+    doi = doi.strip().lower()
+    doi = re.sub(r'^(https?://(dx\.)?doi\.org/|doi:\s*)', '', doi)
+    return doi or None
+
+def norm_arxiv(a_id: Optional[str]) -> Optional[str]:
+    """'http://arxiv.org/abs/2101.00001v2' -> '2101.00001'"""
+    if not a_id: return None
+    a_id = a_id.strip().lower()
+    a_id = re.sub(r'^.*arxiv\.org/(abs|pdf)/', '', a_id)
+    a_id = re.sub(r'^arxiv:', '', a_id)
+    a_id = re.sub(r'(\.pdf)?$', '', a_id)
+    return re.sub(r'v\d+$', '', a_id) or None
+
+def norm_title(title: Optional[str]) -> Optional[str]:
+    words = WORD_RE.findall((title or '').lower())
+    return ' '.join(words) or None
+
+def identifiers(p: Dict) -> Set[Tuple[str, str]]:
+    """레코드의 정규화된 식별자 집합"""
+    keys = set()
+    source = (p.get('source') or '').lower()
+
+    doi = norm_doi(p.get('doi'))
+    if doi:
+        m = ARXIV_DOI_RE.match(doi)
+        keys.add(('arxiv', norm_arxiv(m.group(1))) if m else ('doi', doi))
+
+    if source == 'arxiv':
+        a_id = norm_arxiv(p.get('id'))
+        if a_id: keys.add(('arxiv', a_id))
+    elif source == 'pubmed' and p.get('id'):
+        keys.add(('pmid', str(p['id']).strip()))
+
+    if p.get('pmc_id'):
+        keys.add(('pmc', str(p['pmc_id']).strip().lower()))
+
+    title = norm_title(p.get('title'))
+    if title:
+        keys.add(('title', title))
+    return keys
+
+def shingles(text: str, k: int) -> np.ndarray:
+    """단어 k-gram shingle의 crc32 해시 (중복 제거)"""
+    words = WORD_RE.findall(text.lower())
+    if len(words) < k:
+        grams = [' '.join(words)] if words else []
+    else:
+        grams = [' '.join(words[i:i + k]) for i in range(len(words) - k + 1)]
+    return np.unique(np.fromiter((zlib.crc32(g.encode()) for g in grams), dtype=np.uint64, count=len(grams)))
+
+def perms(num_perm: int, seed: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+    rng = np.random.RandomState(seed)
+    a = rng.randint(1, 1 << 32, size=num_perm, dtype=np.int64).astype(np.uint64)
+    b = rng.randint(0, 1 << 32, size=num_perm, dtype=np.int64).astype(np.uint64)
+    return a, b
+
+def signatures(texts: List[str], num_perm: int = None, k: int = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    배치 전체 MinHash 서명을 한 번에 계산
+    (a*x + b) mod (2^32+15): a, b, x < 2^32 이므로 uint64에서 넘치지 않음
+    반환: (서명 (n, num_perm), shingle이 있는 레코드 여부)
+    """
+    num_perm = num_perm or Config.DEDUP_NUM_PERM
+    k = k or Config.DEDUP_SHINGLE
+
+    sh = [shingles(t, k) for t in texts]
+    sizes = np.array([len(s) for s in sh])
+    valid = sizes > 0
+    sig = np.full((len(texts), num_perm), np.iinfo(np.uint64).max, dtype=np.uint64)
+    if not valid.any():
+        return sig, valid
+
+    x = np.concatenate([s for s in sh if len(s)])
+    a, b = perms(num_perm)
+    h = (a[:, None] * x[None, :] + b[:, None]) % PRIME
+    starts = np.concatenate(([0], np.cumsum(sizes[valid])[:-1]))
+    sig[valid] = np.minimum.reduceat(h, starts, axis=1).T
+    return sig, valid
+
+class _Union:
+    def __init__(self, n: int):
+        self.parent = list(range(n))
+
+    def find(self, i: int) -> int:
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def union(self, i: int, j: int):
+        i, j = self.find(i), self.find(j)
+        if i != j:
+            # 앞선 레코드를 대표로 (결과 순서 유지)
+            self.parent[max(i, j)] = min(i, j)
+
+def fulltext_rank(p: Dict) -> Tuple:
+    """병합 시 기준 레코드 선택: PDF 링크 > 초록 길이"""
+    return (bool(p.get('pdf_url')), len(p.get('abstract') or ''))
+
+def merge(group: List[Dict]) -> Dict:
+    """같은 문헌 레코드 병합 (전문을 받을 수 있는 레코드 기준, 빈 필드는 나머지에서 채움)"""
+    if len(group) == 1:
+        return group[0]
+
+    best = max(group, key=fulltext_rank)
+    merged = dict(best)
+    others = [p for p in group if p is not best]
+    for p in others:
+        for k, v in p.items():
+            if v and not merged.get(k):
+                merged[k] = v
+
+    abstracts = [p.get('abstract') or '' for p in group]
+    merged['abstract'] = max(abstracts, key=len)
+    dups = list(best.get('duplicates') or [])
+    for p in others:
+        dups += [f"{p.get('source', '')}:{p.get('id', '')}"] + list(p.get('duplicates') or [])
+    merged['duplicates'] = list(dict.fromkeys(dups))
+    return merged
+
+def dedup(ps: List[Dict], threshold: float = None, num_perm: int = None, bands: int = None) -> List[Dict]:
+    """
+    중복 문헌을 묶어 병합한 목록 반환 (각 묶음의 첫 등장 위치 유지)
+    threshold: 추정 Jaccard 유사도 기준 (기본값 Config.DEDUP_THRESHOLD)
+    """
+    if len(ps) < 2: return list(ps)
+    threshold = Config.DEDUP_THRESHOLD if threshold is None else threshold
+    num_perm = num_perm or Config.DEDUP_NUM_PERM
+    bands = bands or Config.DEDUP_BANDS
+    rows = max(num_perm // bands, 1)
+
+    uf = _Union(len(ps))
+
+    # 1) 식별자 일치
+    seen: Dict[Tuple[str, str], int] = {}
+    for i, p in enumerate(ps):
+        for key in identifiers(p):
+            if key in seen:
+                uf.union(seen[key], i)
+            else:
+                seen[key] = i
+
+    # 2) MinHash LSH: 밴드가 하나라도 같으면 후보, 서명 일치율로 확인
+    texts = [f"{p.get('title') or ''} {p.get('abstract') or ''}" for p in ps]
+    sig, valid = signatures(texts, num_perm)
+    buckets: Dict[Tuple[int, bytes], List[int]] = {}
+    for i in np.flatnonzero(valid):
+        for band in range(bands):
+            key = (band, sig[i, band * rows:(band + 1) * rows].tobytes())
+            buckets.setdefault(key, []).append(int(i))
+
+    checked = set()
+    near = 0
+    for members in buckets.values():
+        for x, i in enumerate(members):
+            for j in members[x + 1:]:
+                if (i, j) in checked or uf.find(i) == uf.find(j): continue
+                checked.add((i, j))
+                if np.mean(sig[i] == sig[j]) >= threshold:
+                    uf.union(i, j)
+                    near += 1
+
+    groups: Dict[int, List[Dict]] = {}
+    for i, p in enumerate(ps):
+        groups.setdefault(uf.find(i), []).append(p)
+
+    res = [merge(g) for _, g in sorted(groups.items())]
+    logger.info(f"중복 제거: {len(ps)}개 -> {len(res)}개 (유사도 병합 {near}건)")
+    return res
@@ -0,0 +1,21 @@
+import threading
+from config import Config
+
+_model = None
+_lock = threading.Lock()
+
+def get_model():
+    """프로세스 전체에서 공유하는 Gemini 모델 (API 키 없으면 None)"""
+    global _model
+    if _model is None and Config.GOOGLE_API_KEY:
+        with _lock:
+            if _model is None:
+                import google.generativeai as genai
+                genai.configure(api_key=Config.GOOGLE_API_KEY)
+                _model = genai.GenerativeModel(Config.DEFAULT_MODEL)
+    return _model
+
+def generation_config(**kwargs):
+    """genai.types.GenerationConfig (google.generativeai 지연 import)"""
+    import google.generativeai as genai
+    return genai.types.GenerationConfig(**kwargs)
@@ -1,20 +1,115 @@
-import re
-from typing import Dict, List
-import google.generativeai as genai
+import re, json, logging, threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
 from config import Config
+from search.gemini import get_model, generation_config
+from search.result_cache import ResultCache
+import metrics
+
+DOMAINS = [
+    'medicine', 'biology', 'computer_science', 'physics', 'chemistry',
+    'psychology', 'education', 'economics_finance', 'general'
+]
 
 class Intent:
-    def __init__(self):
-        if Config.GOOGLE_API_KEY:
-            genai.configure(api_key=Config.GOOGLE_API_KEY)
-            self.model = genai.GenerativeModel(Config.DEFAULT_MODEL)
-        else:
-            self.model = None
+    def __init__(self, cache: Optional[ResultCache] = None, persist: bool = None):
+        self._model = None
+
+        # 질문 분석 결과 메모이제이션 (메모리 LRU + 선택적 SQLite)
+        self.memo = OrderedDict()
+        self.memo_lock = threading.Lock()
+        persist = Config.ANALYSIS_PERSIST if persist is None else persist
+        self.cache = (cache or ResultCache()) if persist else None
+
+    @property
+    def model(self):
+        """공유 Gemini 모델 (최초 사용 시 생성)"""
+        if self._model is None:
+            self._model = get_model()
+        return self._model
+
+    @model.setter
+    def model(self, m):
+        self._model = m
+
+    def analyze(self, text: str) -> Dict:
+        """
+        질문 분석을 Gemini 1회 호출로 처리
+        키워드, 영어 검색 구문, 학술 영역을 함께 반환
+        """
+        key = ResultCache.normalize(text)
+
+        with self.memo_lock:
+            if key in self.memo:
+                self.memo.move_to_end(key)
+                metrics.cache('analysis', True)
+                return dict(self.memo[key])
+
+        res = self.cache.get('analysis', key) if self.cache else None
+        metrics.cache('analysis', res is not None)
+        if res is None:
+            with metrics.span('intent.analyze_llm'):
+                res = self.analyze_llm(text)
+            if self.cache and res.get('source') == 'llm':
+                self.cache.put('analysis', key, res)
+
+        # 일시적인 LLM 오류로 만든 폴백 결과는 기억하지 않음
+        if res.get('source') == 'llm' or not self.model:
+            with self.memo_lock:
+                self.memo[key] = res
+                while len(self.memo) > Config.ANALYSIS_MEMO_SIZE:
+                    self.memo.popitem(last=False)
+        return dict(res)
+
+    def analyze_llm(self, text: str) -> Dict:
+        fallback = {
+            'keywords': text.split()[:5],
+            'query': ' '.join(text.split()[:5]),
+            'domains': self.Domain(text),
+            'source': 'fallback'
+        }
+        if not self.model:
+            return fallback
+
+        prompt = f"""
+        다음 질문을 학술 검색용으로 분석해서 JSON 하나만 출력해줘.
+        - "keywords": 학술 검색에 가장 중요한 핵심 키워드 3-5개 (질문 언어 그대로)
+        - "query": PubMed와 ArXiv 검색에 가장 효과적인 2~3 단어의 간단한 영어 검색 구문
+          (예시: ['인공지능', '신약 개발'] -> "AI in drug discovery")
+        - "domains": 다음 중 해당하는 영역 목록 {DOMAINS}
+        질문: "{text}"
+        """
+        try:
+            response = self.model.generate_content(
+                prompt,
+                generation_config=generation_config(
+                    temperature=0.1,
+                    response_mime_type='application/json'
+                )
+            )
+            data = json.loads(response.text)
+            keys = [str(k).strip() for k in data.get('keywords', []) if str(k).strip()][:5]
+            query = str(data.get('query', '')).strip().replace('"', '')
+            domains = [d for d in data.get('domains', []) if d in DOMAINS]
+
+            if not keys or not query:
+                return fallback
+
+            logging.info(f"Gemini 질문 분석 성공: {keys} -> '{query}'")
+            return {
+                'keywords': keys,
+                'query': query,
+                'domains': domains or fallback['domains'],
+                'source': 'llm'
+            }
+        except Exception as e:
+            logging.error(f"Gemini 질문 분석 오류: {e}")
+            return fallback
 
     def Key(self, text: str) -> List[str]:
         """키워드 추출"""
         if not self.model:
-            return text.split[:5]
+            return text.split()[:5]
         
         try:
             prompt = f"""
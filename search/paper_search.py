@@ -1,41 +1,61 @@
-import requests, logging, time
+import logging, time, threading
 import xml.etree.ElementTree as ET
-from typing import List, Dict
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import TYPE_CHECKING, Iterator, List, Dict, Set, Tuple
 from config import Config
-from bs4 import BeautifulSoup
 from urllib.parse import quote
-import google.generativeai as genai
+from search.result_cache import ResultCache
+from http_client import HttpClient, get_client
+from paper_library import PaperLibrary, get_library
+from search.gemini import get_model, generation_config
+from search.dedup import dedup
+import metrics
+
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 class Search:
-    def __init__(self):
+    def __init__(self, cache: ResultCache = None, http: HttpClient = None, library: PaperLibrary = None):
         self.max_results = Config.MAX_RESULTS
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Academic-RAG-Bot/1.0 (non-commercial)'
-        })
-
-        if Config.GOOGLE_API_KEY:
-            genai.configure(api_key=Config.GOOGLE_API_KEY)
-            self.gemini_model = genai.GenerativeModel(Config.DEFAULT_MODEL)
-        else:
-            self.gemini_model = None
+        self.cache = cache or ResultCache()
+        self.library = library if library is not None else get_library()
+        # Download와 공유하는 HTTP 클라이언트 (호스트별 속도 / 동시 요청 제한, 재시도)
+        self.http = http or get_client()
+
+        self._gemini_model = None
 
         self.search_methods = {
             'arxiv': self.search_arxiv,
             'pubmed': self.search_pubmed
         }
+        # 소스별 동시 검색용 (마감 시간을 넘긴 호출은 백그라운드에서 마저 끝남)
+        self.pool = ThreadPoolExecutor(max_workers=len(self.search_methods) * 4, thread_name_prefix='search')
+        # 진행 중인 라이브러리 갱신 (같은 검색 구문 중복 실행 방지)
+        self.refreshing: Set[str] = set()
+        self.refresh_lock = threading.Lock()
+
+    @property
+    def gemini_model(self):
+        """공유 Gemini 모델 (최초 사용 시 생성)"""
+        if self._gemini_model is None:
+            self._gemini_model = get_model()
+        return self._gemini_model
 
-    def scrape(self, url:str, params: dict = None) -> BeautifulSoup:
+    @gemini_model.setter
+    def gemini_model(self, m):
+        self._gemini_model = m
+
+    def scrape(self, url:str, params: dict = None) -> 'BeautifulSoup':
         """내부용 스크래핑 함수"""
         try:
-            time.sleep(1.5)
             logging.info(f"Scraping: {url}")
-            res = self.session.get(url, params=params, timeout=30)
+            res = self.http.get(url, params=params, timeout=30)
             res.raise_for_status()
+            from bs4 import BeautifulSoup
             return BeautifulSoup(res.content, "html.parser")
-        except requests.exceptions.RequestException as e:
+        except Exception as e:
             logging.error(f"Failed to scrape {url}: {e}")
             return None
 
@@ -54,7 +74,7 @@ class Search:
         try:
             response = self.gemini_model.generate_content(
                 prompt,
-                generation_config=genai.types.GenerationConfig(temperature=0.1)
+                generation_config=generation_config(temperature=0.1)
             )
             query = response.text.strip().replace('"', '')
             logging.info(f"Gemini 번역 성공: {keyword} -> '{query}'")
@@ -64,28 +84,141 @@ class Search:
             return " ".join(keyword)
         
 
-    def search_all(self, keyword: List[str], max_results: int = None) -> List[Dict]:
-        """모든 API에서 논문 검색"""
-        if not keyword: return []
+    def search_all(self, keyword: List[str], max_results: int = None, query: str = None) -> List[Dict]:
+        """
+        모든 API에서 논문 검색
+        query(영어 검색 구문)가 주어지면 번역 호출 생략
+        """
+        return self.search_all_status(keyword, max_results, query)['papers']
+
+    def search_all_status(self, keyword: List[str], max_results: int = None, query: str = None,
+                          deadline: float = None) -> Dict:
+        """
+        모든 소스를 동시에 검색, deadline(초)까지 도착한 결과만 반환
+        로컬 라이브러리에서 검색어를 모두 포함한 문헌이 LIBRARY_MIN_HITS개 이상이면 외부 검색 생략
+        반환: {'papers', 'query', 'sources': {소스: {'status', 'count', 'elapsed'}}, 'elapsed'}
+        """
+        start = time.perf_counter()
+        if not keyword and not query:
+            return {'papers': [], 'query': '', 'sources': {}, 'elapsed': 0.0}
         max_results = max_results or self.max_results
+        deadline = Config.SEARCH_DEADLINE if deadline is None else deadline
+
+        q = query or self.translate(keyword)
+        n = max_results // len(self.search_methods)
+
+        all, sources, local = [], {}, []
+        if self.library is not None:
+            with metrics.span('search.library'):
+                # 라이브러리는 소스별 레코드를 따로 저장하므로 (arXiv / PubMed 등) 개수 판단 전에 병합
+                local = dedup(self.library.search(q, max_results))
+            enough = len(local) >= Config.LIBRARY_MIN_HITS
+            metrics.cache('library', enough)
+            sources['library'] = {'status': 'ok' if enough else 'partial', 'count': len(local),
+                                  'elapsed': round(time.perf_counter() - start, 3)}
+            if enough:
+                logging.info(f"로컬 라이브러리에서 {len(local)}개 논문 사용 (외부 검색 생략)")
+                key = ResultCache.normalize(q)
+                if self.library.needs_refresh(key):
+                    with self.refresh_lock:
+                        start_refresh = key not in self.refreshing
+                        self.refreshing.add(key)
+                    if start_refresh:
+                        metrics.submit(self.pool, self.refresh, q, n)
+                return {
+                    'papers': local[:max_results],
+                    'query': q,
+                    'sources': sources,
+                    'elapsed': round(time.perf_counter() - start, 3)
+                }
 
-        q = self.translate(keyword)
+        futures = {name: metrics.submit(self.pool, self.search_source, name, q, n) for name in self.search_methods}
+        remaining = max(deadline - (time.perf_counter() - start), 0)
+        wait(futures.values(), timeout=remaining)
 
-        all = []
-        for name, search_func in self.search_methods.items():
+        for name, f in futures.items():
+            if not f.done():
+                f.cancel()
+                sources[name] = {'status': 'timeout', 'count': 0, 'elapsed': round(time.perf_counter() - start, 3)}
+                logging.warning(f"'{name}' 검색이 마감 시간({deadline}s) 내에 끝나지 않아 제외")
+                continue
             try:
-                ps = search_func(q, max_results // len(self.search_methods))
-                logging.info(f"{name}에서 {len(ps)}개 논문 발견")
+                ps, status = f.result()
                 all.extend(ps)
             except Exception as e:
                 logging.error(f"'{name}' 검색 중 오류 발생: {e}")
-            
-        unique = list({p['title'].strip().lower(): p for p in all}.values())
-        logging.info(f"총 {len(all)}개 발견, 중복 제거 후 {len(unique)}개")
-        return unique[:max_results]
+                status = {'status': 'error', 'count': 0, 'elapsed': None}
+            sources[name] = status
+
+        # 식별자 / 제목+초록 유사도로 소스 간 중복 병합 (다운로드 전에)
+        self.remember(all)
+        unique = dedup(local + all)
+        logging.info(f"총 {len(local) + len(all)}개 발견, 중복 제거 후 {len(unique)}개")
+        return {
+            'papers': unique[:max_results],
+            'query': q,
+            'sources': sources,
+            'elapsed': round(time.perf_counter() - start, 3)
+        }
+
+    def remember(self, ps: List[Dict]):
+        """검색 결과 메타데이터 / 초록을 로컬 라이브러리에 추가"""
+        if self.library is None: return
+        for p in ps:
+            try:
+                self.library.add(p)
+            except Exception as e:
+                logging.warning(f"라이브러리 저장 실패 {p.get('id')}: {e}")
+
+    def refresh(self, q: str, n: int):
+        """
+        백그라운드 갱신: 결과 캐시를 거치지 않고 외부 소스를 다시 검색해 새 문헌을 라이브러리에 추가
+        한 소스라도 응답을 받았으면 (결과가 없어도) 갱신 시각 기록, 모두 실패하면 다음 검색에서 다시 시도
+        """
+        key = ResultCache.normalize(q)
+        try:
+            ok = 0
+            for name in self.search_methods:
+                try:
+                    ps, status = self.search_source(name, q, n, use_cache=False)
+                    self.remember(ps)
+                    ok += status['status'] in ('ok', 'empty')
+                except Exception as e:
+                    logging.warning(f"'{name}' 라이브러리 갱신 실패: {e}")
+            if ok:
+                self.library.mark_refreshed(key)
+                logging.info(f"라이브러리 갱신 완료: '{q}'")
+            else:
+                logging.warning(f"라이브러리 갱신 실패 (모든 소스): '{q}'")
+        finally:
+            with self.refresh_lock:
+                self.refreshing.discard(key)
+
+    def search_source(self, name: str, q: str, n: int, use_cache: bool = True) -> Tuple[List[Dict], Dict]:
+        """
+        단일 소스 검색 (캐시 우선), (결과, 상태) 반환
+        요청 실패는 예외로 전달 (빈 결과 'empty'와 구분)
+        """
+        start = time.perf_counter()
+
+        ps = self.cache.get_results(name, q, n) if use_cache else None
+        if use_cache:
+            metrics.cache('search', ps is not None)
+        if ps is not None:
+            logging.info(f"{name} 캐시에서 {len(ps)}개 논문 사용")
+            status = 'cached'
+        else:
+            with metrics.span(f'search.{name}'):
+                ps = self.search_methods[name](q, n)
+            logging.info(f"{name}에서 {len(ps)}개 논문 발견")
+            if ps:
+                self.cache.put_results(name, q, n, ps)
+            status = 'ok' if ps else 'empty'
+
+        return ps, {'status': status, 'count': len(ps), 'elapsed': round(time.perf_counter() - start, 3)}
 
     def search_pubmed(s, q: str, max : int=10) -> List[Dict]:
-        """PubMed API를 통한 논문 검색"""
+        """PubMed API를 통한 논문 검색 (esearch + efetch 1회로 초록까지 수집)"""
         try:
             url = f"{Config.PUBMED_URL}esearch.fcgi"
             param = {
@@ -95,56 +228,86 @@ class Search:
                 "retmode": "json"
             }
 
-            res = s.session.get(url, params=param, timeout=15)
+            res = s.http.get(url, params=param, timeout=15)
             res.raise_for_status()
             ids = res.json().get("esearchresult", {}).get("idlist", [])
             if not ids: return []
-        
-            f_url = f"{Config.PUBMED_URL}esummary.fcgi"
+
+            f_url = f"{Config.PUBMED_URL}efetch.fcgi"
             f_params = {
                 "db": "pubmed",
                 "id": ','.join(ids),
-                "retmode": "json"
+                "rettype": "abstract",
+                "retmode": "xml"
             }
 
-            f_res = s.session.get(f_url, params=f_params, timeout=15)
-            f_res.raise_for_status()
-            data = f_res.json().get("result", {})
-        
-            ps = []
-            for pmid in ids:
-                p_data = data.get(pmid)
-                if not p_data:
-                    continue
-        
-                title = p_data.get("title", "").strip()
-                authors = [author.get('name', '') for author in p_data.get("authors", []) if author.get('name')]
-                web_url = f"https://pubmed.ncbi.nlm.nih.gov/{pmid}/"
+            with s.http.stream(f_url, params=f_params, timeout=15) as f_res:
+                f_res.raise_for_status()
+                records = {p['id']: p for p in s.parse_pubmed_xml(f_res.raw)}
 
-                ps.append({
-                    'id': pmid,
-                    'title': title,
-                    'authors': authors,
-                    'abstract': p_data.get("elocationid", ""),
-                    'pdf_url': None,
-                    'web_url': web_url,
-                    'source': 'PubMed'
-                })
-            return ps
+            return [records[pmid] for pmid in ids if pmid in records]
         except Exception as e:
             logging.error(f"PubMed 검색 오류: {e}")
-            return []
+            raise
+
+    def parse_pubmed_xml(s, stream) -> Iterator[Dict]:
+        """efetch XML을 논문 단위로 스트리밍 파싱 (처리한 요소는 바로 해제)"""
+        for _, elem in ET.iterparse(stream, events=('end',)):
+            if elem.tag != 'PubmedArticle':
+                continue
+
+            pmid = elem.findtext('.//MedlineCitation/PMID', default='').strip()
+            art = elem.find('.//MedlineCitation/Article')
+            if not pmid or art is None:
+                elem.clear()
+                continue
+
+            title = ''.join(art.find('ArticleTitle').itertext()).strip() if art.find('ArticleTitle') is not None else ''
+
+            parts = []
+            for a in art.findall('Abstract/AbstractText'):
+                text = ''.join(a.itertext()).strip()
+                if not text: continue
+                label = a.get('Label')
+                parts.append(f"{label}: {text}" if label else text)
+
+            authors = []
+            for a in art.findall('AuthorList/Author'):
+                last, fore = a.findtext('LastName'), a.findtext('Initials') or a.findtext('ForeName')
+                name = f"{last} {fore}" if last and fore else (last or a.findtext('CollectiveName'))
+                if name:
+                    authors.append(name)
+
+            year = art.findtext('Journal/JournalIssue/PubDate/Year') \
+                or (art.findtext('Journal/JournalIssue/PubDate/MedlineDate') or '')[:4]
+
+            ids = {i.get('IdType'): (i.text or '').strip() for i in elem.findall('.//PubmedData/ArticleIdList/ArticleId')}
+            pmc = ids.get('pmc')
+
+            elem.clear()
+            yield {
+                'id': pmid,
+                'title': title,
+                'authors': authors,
+                'abstract': '\n'.join(parts),
+                'year': year,
+                'doi': ids.get('doi'),
+                'pmc_id': pmc,
+                'pdf_url': f"{Config.PMC_URL}{pmc}/pdf/" if pmc else None,
+                'web_url': f"https://pubmed.ncbi.nlm.nih.gov/{pmid}/",
+                'source': 'PubMed'
+            }
 
     def search_arxiv(s, q: str, max: int=10) -> List[Dict]:
         """ArXiv API를 통한 논문 검색"""
         try:
             url = f"{Config.ARXIV_URL}?search_query=all:{quote(q)}&start=0&max_results={max}"
             
-            res = s.session.get(url, timeout=15)
+            res = s.http.get(url, timeout=15)
             res.raise_for_status()
         
             root = ET.fromstring(res.text)
-            ns = {'atom': 'http://www.w3.org/2005/Atom'}
+            ns = {'atom': 'http://www.w3.org/2005/Atom', 'arxiv': 'http://arxiv.org/schemas/atom'}
             entries = root.findall('atom:entry', ns)
         
             ps = []
@@ -163,12 +326,14 @@ class Search:
                         break
 
                 abs_link = f"https://arxiv.org/abs/{id}"
+                doi = e.find('arxiv:doi', ns)
                   
                 ps.append({
                     'id': p_id,
                     'title': title,
                     'authors': authors,
                     'abstract': abstract,
+                    'doi': doi.text.strip() if doi is not None and doi.text else None,
                     'pdf_url': pdf_link,
                     'web_url' : abs_link,
                     'source': 'ArXiv'
@@ -176,4 +341,4 @@ class Search:
             return ps
         except Exception as e:
             logging.error(f"ArXiv 검색 오류: {e}")
-            return []
\ No newline at end of file
+            raise
\ No newline at end of file
@@ -0,0 +1,84 @@
+import re, json, time, sqlite3, logging, threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+class ResultCache:
+    """
+    SQLite 기반 TTL 캐시 (네임스페이스별 TTL, 항목 수 초과 시 오래 안 쓴 순 삭제)
+    검색 결과는 (소스, 정규화된 질의, 최대 결과 수)로 저장
+    """
+    def __init__(self, path: Union[str, Path] = None, ttl: Dict[str, float] = None, max_entries: int = None):
+        path = Path(path or Config.SEARCH_CACHE_DB)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        self.ttl = Config.SEARCH_CACHE_TTL if ttl is None else ttl
+        self.max_entries = max_entries or Config.SEARCH_CACHE_MAX_ENTRIES
+        self.lock = threading.Lock()
+        self.writes = 0
+
+        self.conn = sqlite3.connect(str(path), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            " ns TEXT NOT NULL, key TEXT NOT NULL, created REAL NOT NULL, accessed REAL NOT NULL, value TEXT NOT NULL,"
+            " PRIMARY KEY (ns, key))"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed)")
+        self.conn.commit()
+
+    @staticmethod
+    def normalize(q: str) -> str:
+        return re.sub(r'\s+', ' ', q.replace('"', ' ').replace("'", ' ')).strip().lower()
+
+    def get(self, ns: str, key: str) -> Optional[Any]:
+        now = time.time()
+        ttl = self.ttl.get(ns, self.ttl.get('default', 3600))
+
+        with self.lock:
+            row = self.conn.execute("SELECT created, value FROM cache WHERE ns = ? AND key = ?", (ns, key)).fetchone()
+            if row is None: return None
+
+            if now - row[0] > ttl:
+                self.conn.execute("DELETE FROM cache WHERE ns = ? AND key = ?", (ns, key))
+                self.conn.commit()
+                return None
+
+            self.conn.execute("UPDATE cache SET accessed = ? WHERE ns = ? AND key = ?", (now, ns, key))
+            self.conn.commit()
+        return json.loads(row[1])
+
+    def put(self, ns: str, key: str, value: Any):
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?, ?)",
+                (ns, key, now, now, json.dumps(value, ensure_ascii=False))
+            )
+            self.writes += 1
+            if self.writes % 50 == 0:
+                self.evict()
+            self.conn.commit()
+
+    def evict(self):
+        """항목 수 초과분을 마지막 사용 시각 순으로 삭제 (lock 보유 상태에서 호출)"""
+        n = self.conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+        if n > self.max_entries:
+            self.conn.execute(
+                "DELETE FROM cache WHERE rowid IN (SELECT rowid FROM cache ORDER BY accessed LIMIT ?)",
+                (n - self.max_entries,)
+            )
+            logger.info(f"검색 캐시 {n - self.max_entries}개 항목 삭제")
+
+    def get_results(self, source: str, q: str, max_results: int) -> Optional[List[Dict]]:
+        """캐시된 검색 결과 (없거나 만료 시 None)"""
+        return self.get(source, f"{self.normalize(q)}|{max_results}")
+
+    def put_results(self, source: str, q: str, max_results: int, ps: List[Dict]):
+        self.put(source, f"{self.normalize(q)}|{max_results}", ps)
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
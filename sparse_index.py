@@ -0,0 +1,318 @@
+import os, json, hashlib, logging, threading
+import numpy as np
+import scipy.sparse as sp
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+class SparseIndex:
+    """
+    해싱 기반 증분 TF-IDF 인덱스
+    문서 추가/삭제 시 문서 크기만큼만 갱신, IDF는 전체 누적 코퍼스 기준
+    디스크: 새 행은 세그먼트(npz)로, 문서 id / 해시 / 메타데이터는 docs.jsonl 로그에 추가만 함
+    df는 저장하지 않고 불러올 때 세그먼트에서 다시 계산
+    """
+    def __init__(self, path: Union[str, Path] = None, n_features: int = None):
+        self.path = Path(path) if path else None
+        self.n_features = n_features or Config.INDEX_FEATURES
+        self._vectorizer = None
+
+        self.df = np.zeros(self.n_features, dtype=np.int32)
+        self.ids: List[Optional[str]] = []      # 행 번호 -> 문서 id (삭제 시 None)
+        self.rows: Dict[str, int] = {}          # 문서 id -> 행 번호
+        self.hashes: Dict[str, str] = {}
+        self.meta: Dict[str, Dict] = {}
+
+        self.matrix = sp.csr_matrix((0, self.n_features), dtype=np.float32)
+        self.pending: List[sp.csr_matrix] = []
+        self.segments: List[Dict] = []          # [{'name', 'rows'}] 행 순서대로
+        self.next_segment = 0
+        self.log: List[Dict] = []               # 아직 저장하지 않은 추가 / 삭제 기록
+        self.saved_rows = 0
+        self.norms = None
+        self.lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self.rows
+
+    @property
+    def dirty(self) -> bool:
+        """저장하지 않은 추가 / 삭제가 있는지"""
+        return bool(self.log) or self.saved_rows < len(self.ids)
+
+    @property
+    def vectorizer(self):
+        """HashingVectorizer (scikit-learn은 최초 사용 시 import)"""
+        if self._vectorizer is None:
+            from sklearn.feature_extraction.text import HashingVectorizer
+            self._vectorizer = HashingVectorizer(
+                n_features=self.n_features,
+                alternate_sign=False,
+                norm=None,
+                stop_words='english'
+            )
+        return self._vectorizer
+
+    def tf(self, texts: List[str]) -> sp.csr_matrix:
+        """로그 스케일 단어 빈도 (sublinear tf)"""
+        m = self.vectorizer.transform(texts).astype(np.float32).tocsr()
+        np.log1p(m.data, out=m.data)
+        return m
+
+    def add(self, doc_id: str, text: str, meta: Dict = None) -> bool:
+        """문서 추가 (같은 id, 같은 내용이면 무시 / 내용이 바뀌면 교체)"""
+        h = hashlib.sha1(text.encode('utf-8')).hexdigest()
+        with self.lock:
+            if self.hashes.get(doc_id) == h:
+                return False
+            if doc_id in self.rows:
+                self.remove(doc_id)
+
+            row = self.tf([text])
+            self.df[row.indices] += 1
+
+            self.rows[doc_id] = len(self.ids)
+            self.ids.append(doc_id)
+            self.hashes[doc_id] = h
+            self.meta[doc_id] = meta or {}
+            self.log.append({'row': self.rows[doc_id], 'id': doc_id, 'hash': h, 'meta': self.meta[doc_id]})
+            self.pending.append(row)
+            self.norms = None
+            return True
+
+    def remove(self, doc_id: str) -> bool:
+        """문서 삭제 (행은 비워두고 compact 시 정리)"""
+        with self.lock:
+            r = self.rows.pop(doc_id, None)
+            if r is None: return False
+
+            self.consolidate()
+            start, end = self.matrix.indptr[r], self.matrix.indptr[r + 1]
+            self.df[self.matrix.indices[start:end]] -= 1
+            self.matrix.data[start:end] = 0
+
+            self.ids[r] = None
+            self.hashes.pop(doc_id, None)
+            self.meta.pop(doc_id, None)
+            self.log.append({'del': doc_id})
+            self.norms = None
+
+            if len(self.ids) > 64 and len(self.rows) < len(self.ids) * 0.75:
+                self.compact()
+            return True
+
+    def consolidate(self):
+        """추가 대기 중인 행을 행렬에 합치기"""
+        if self.pending:
+            self.matrix = sp.vstack([self.matrix] + self.pending, format='csr')
+            self.pending = []
+
+    def compact(self):
+        """삭제된 행 제거 (전체 재저장 필요)"""
+        self.consolidate()
+        alive = [i for i, d in enumerate(self.ids) if d is not None]
+        self.matrix = self.matrix[alive]
+        self.matrix.eliminate_zeros()
+        self.ids = [self.ids[i] for i in alive]
+        self.rows = {d: i for i, d in enumerate(self.ids)}
+        self.saved_rows = 0
+        self.segments = []
+        self.log = []
+        self.norms = None
+
+    def idf(self) -> np.ndarray:
+        n = len(self.rows)
+        return (np.log((1 + n) / (1 + self.df.astype(np.float32))) + 1).astype(np.float32)
+
+    def search(self, q: str, top_k: int = 5, ids: Iterable[str] = None) -> List[Tuple[str, float]]:
+        """
+        코사인 유사도 상위 top_k (ids 지정 시 해당 문서로 한정)
+        ids 지정 시 후보 행만 모아 norm 계산 (누적 코퍼스 크기와 무관, 대기 중인 행도 합치지 않음)
+        """
+        with self.lock:
+            if not self.rows: return []
+            idf = self.idf()
+
+            if ids is None:
+                self.consolidate()
+                if self.norms is None:
+                    sq = self.matrix.multiply(self.matrix).tocsr()
+                    self.norms = np.sqrt(sq @ (idf * idf))
+                cand = np.array([r for r in self.rows.values()], dtype=np.int64)
+                m, norms = self.matrix[cand], self.norms[cand]
+            else:
+                cand = np.array([self.rows[i] for i in ids if i in self.rows], dtype=np.int64)
+                if cand.size == 0: return []
+                cand, m = self.take(cand)
+                norms = np.sqrt(m.multiply(m).tocsr() @ (idf * idf))
+
+            qv = self.tf([q]).multiply(idf * idf).tocsr()
+            scores = (m @ qv.T).toarray().ravel()
+
+            q_norm = np.sqrt(self.tf([q]).multiply(idf).power(2).sum())
+            denom = norms * q_norm
+            scores = np.divide(scores, denom, out=np.zeros_like(scores), where=denom > 0)
+
+            k = min(top_k, cand.size)
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = sorted(top, key=lambda i: (-scores[i], cand[i]))
+
+            return [(self.ids[cand[i]], float(scores[i])) for i in top]
+
+    def take(self, cand: np.ndarray) -> Tuple[np.ndarray, sp.csr_matrix]:
+        """행 번호 -> (재정렬된 행 번호, 해당 행 행렬), 대기 중인 행은 pending에서 바로 참조"""
+        n = self.matrix.shape[0]
+        stored, waiting = cand[cand < n], cand[cand >= n]
+        if waiting.size == 0:
+            return stored, self.matrix[stored]
+        parts = ([self.matrix[stored]] if stored.size else []) + [self.pending[r - n] for r in waiting]
+        return np.concatenate([stored, waiting]), sp.vstack(parts, format='csr')
+
+    def save(self, path: Union[str, Path] = None):
+        """
+        새로 추가된 행만 세그먼트로 저장하고 추가 / 삭제 기록을 로그에 덧붙임
+        (compact 후에는 전체 재저장), 크기가 비슷한 세그먼트는 병합
+        """
+        path = Path(path or self.path)
+        path.mkdir(parents=True, exist_ok=True)
+
+        with self.lock:
+            self.consolidate()
+            full = self.saved_rows == 0
+            if full:
+                self.segments = []
+
+            if self.saved_rows < len(self.ids):
+                self.write_segment(path, self.saved_rows, len(self.ids))
+                self.saved_rows = len(self.ids)
+                self.merge_segments(path)
+
+            if full:
+                tmp = path / 'docs.jsonl.tmp'
+                with open(tmp, 'w', encoding='utf-8') as f:
+                    f.writelines(self.log_line({'row': r, 'id': d, 'hash': self.hashes[d], 'meta': self.meta[d]})
+                                 for r, d in enumerate(self.ids) if d is not None)
+                os.replace(tmp, path / 'docs.jsonl')
+            elif self.log:
+                with open(path / 'docs.jsonl', 'a', encoding='utf-8') as f:
+                    f.write(''.join(self.log_line(e) for e in self.log))
+            self.log = []
+
+            state = {'n_features': self.n_features, 'segments': self.segments, 'next_segment': self.next_segment}
+            tmp = path / 'index.json.tmp'
+            tmp.write_text(json.dumps(state), encoding='utf-8')
+            os.replace(tmp, path / 'index.json')
+
+            # 병합 / 재저장으로 더 이상 쓰지 않는 세그먼트는 상태 파일 교체 후 삭제
+            live = {s['name'] for s in self.segments}
+            for f in path.glob('segment-*.npz'):
+                if f.name not in live:
+                    f.unlink()
+
+    @staticmethod
+    def log_line(e: Dict) -> str:
+        return json.dumps(e, ensure_ascii=False) + '\n'
+
+    def write_segment(self, path: Path, start: int, end: int):
+        name = f"segment-{self.next_segment:05d}.npz"
+        self.next_segment += 1
+        m = self.matrix[start:end]
+        m.eliminate_zeros()
+        sp.save_npz(path / name, m, compressed=True)
+        self.segments.append({'name': name, 'rows': end - start})
+
+    def merge_segments(self, path: Path):
+        """
+        계층 병합: 직전 세그먼트가 마지막 세그먼트의 INDEX_MERGE_RATIO배 이하이면 둘을 합침
+        세그먼트 수는 O(log N), 각 행이 다시 쓰이는 횟수도 O(log N)
+        """
+        while len(self.segments) >= 2 and (
+            self.segments[-2]['rows'] <= self.segments[-1]['rows'] * Config.INDEX_MERGE_RATIO
+            or len(self.segments) > Config.INDEX_MAX_SEGMENTS
+        ):
+            b, a = self.segments.pop(), self.segments.pop()
+            start = sum(s['rows'] for s in self.segments)
+            self.write_segment(path, start, start + a['rows'] + b['rows'])
+
+    @classmethod
+    def load(cls, path: Union[str, Path] = None) -> 'SparseIndex':
+        """저장된 인덱스 불러오기 (없으면 빈 인덱스)"""
+        path = Path(path or Config.INDEX_DIR)
+        state_file = path / 'index.json'
+        if not state_file.exists():
+            return cls(path)
+
+        try:
+            state = json.loads(state_file.read_text(encoding='utf-8'))
+            index = cls(path, state['n_features'])
+            if 'ids' in state:
+                return cls.load_legacy(index, path, state)
+
+            mats = [sp.load_npz(path / s['name']).tocsr().astype(np.float32) for s in state['segments']]
+            if mats:
+                index.matrix = sp.vstack(mats, format='csr')
+            index.segments = state['segments']
+            index.next_segment = state['next_segment']
+
+            # 로그 재생 (상태 파일에 기록된 세그먼트 밖의 행은 저장 도중 중단된 것이므로 무시)
+            n = index.matrix.shape[0]
+            index.ids = [None] * n
+            log_file = path / 'docs.jsonl'
+            if log_file.exists():
+                with open(log_file, encoding='utf-8') as f:
+                    for line in f:
+                        try:
+                            e = json.loads(line)
+                        except json.JSONDecodeError:
+                            continue
+                        if 'del' in e:
+                            r = index.rows.pop(e['del'], None)
+                            if r is not None:
+                                index.ids[r] = None
+                            index.hashes.pop(e['del'], None)
+                            index.meta.pop(e['del'], None)
+                        elif e['row'] < n:
+                            old = index.rows.get(e['id'])
+                            if old is not None:
+                                index.ids[old] = None
+                            index.ids[e['row']] = e['id']
+                            index.rows[e['id']] = e['row']
+                            index.hashes[e['id']] = e['hash']
+                            index.meta[e['id']] = e['meta']
+            index.saved_rows = n
+
+            index.clear_dead_rows()
+            logger.info(f"TF-IDF 인덱스 로드 완료: {len(index)}개 문서, 세그먼트 {len(index.segments)}개")
+            return index
+        except Exception as e:
+            logger.warning(f"TF-IDF 인덱스 로드 실패, 새로 생성: {e}")
+            return cls(path)
+
+    @classmethod
+    def load_legacy(cls, index: 'SparseIndex', path: Path, state: Dict) -> 'SparseIndex':
+        """이전 형식 (index.json에 id / 메타데이터 전체) -> 다음 저장 때 새 형식으로 전체 재저장"""
+        mats = [sp.load_npz(path / s).tocsr().astype(np.float32) for s in state['segments']]
+        if mats:
+            index.matrix = sp.vstack(mats, format='csr')
+        index.ids = state['ids']
+        index.rows = {d: i for i, d in enumerate(index.ids) if d is not None}
+        index.hashes = state['hashes']
+        index.meta = state['meta']
+        index.clear_dead_rows()
+        (path / 'df.npy').unlink(missing_ok=True)
+        logger.info(f"TF-IDF 인덱스 로드 완료 (이전 형식): {len(index)}개 문서")
+        return index
+
+    def clear_dead_rows(self):
+        """삭제된 행을 비우고 남은 행으로 df 계산"""
+        for i, d in enumerate(self.ids):
+            if d is None:
+                start, end = self.matrix.indptr[i], self.matrix.indptr[i + 1]
+                self.matrix.data[start:end] = 0
+        self.matrix.eliminate_zeros()
+        self.df = np.bincount(self.matrix.indices, minlength=self.n_features).astype(np.int32)
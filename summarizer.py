@@ -0,0 +1,151 @@
+"""
+배치 추출 요약
+- 배치 전체 문장으로 문장-단어 행렬을 한 번만 만들고
+- 문서별 문장 유사도 블록(block diagonal)에서 TextRank / 중심성 점수를 한꺼번에 계산
+"""
+import re, logging
+import numpy as np
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+WORD_RE = re.compile(r'[가-힣]{2,}|[a-z][a-z0-9]{2,}')
+ACADEMIC = {
+    'paper', 'study', 'research', 'analysis', 'method', 'result',
+    'conclusion', 'abstract', 'introduction', 'discussion'
+}
+FALLBACK = {
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
+    'of', 'with', 'by', 'is', 'are', 'was', 'were', 'be', 'been', 'have',
+    'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could', 'should'
+}
+DAMPING = 0.85
+
+@lru_cache(maxsize=1)
+def stop_words() -> frozenset:
+    """키워드/요약용 영어 불용어 (NLTK 불용어 + 학술 일반어, 최초 1회만 생성)"""
+    try:
+        from nltk.corpus import stopwords
+        stop_w = set(stopwords.words('english'))
+        stop_w.update(ACADEMIC)
+    except (ImportError, LookupError):
+        # nltk 미설치 또는 stopwords 코퍼스 미다운로드
+        stop_w = set(FALLBACK)
+    return frozenset(stop_w)
+
+def sentences(text: str) -> List[str]:
+    """tProcessor.clean 결과('. '로 연결된 문장) 분리"""
+    return [s for s in text.split('. ') if s.strip()]
+
+def sentence_matrix(docs: List[List[str]]):
+    """
+    배치 전체 문장의 문장-단어 행렬 (log tf * idf, 행 L2 정규화)
+    반환: (csr 행렬, 문서별 시작 offset)
+    """
+    from scipy import sparse
+
+    stop = stop_words()
+    vocab: Dict[str, int] = {}
+    rows, cols = [], []
+    offsets = [0]
+    n = 0
+    for sents in docs:
+        for s in sents:
+            for w in WORD_RE.findall(s.lower()):
+                if w in stop: continue
+                rows.append(n)
+                cols.append(vocab.setdefault(w, len(vocab)))
+            n += 1
+        offsets.append(n)
+
+    data = np.ones(len(rows), dtype=np.float32)
+    X = sparse.csr_matrix((data, (rows, cols)), shape=(n, max(len(vocab), 1)), dtype=np.float32)
+    X.sum_duplicates()
+    X.data = 1.0 + np.log(X.data)
+
+    df = np.bincount(X.indices, minlength=X.shape[1])
+    idf = (np.log((1 + n) / (1 + df)) + 1.0).astype(np.float32)
+    X = X.multiply(idf).tocsr()
+
+    norms = np.sqrt(np.asarray(X.multiply(X).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    X = sparse.diags(1.0 / norms) @ X
+    return X.tocsr(), np.asarray(offsets)
+
+def similarity(X, offsets: np.ndarray):
+    """문서 내부 문장끼리만의 코사인 유사도 (block diagonal, 대각 0)"""
+    from scipy import sparse
+
+    blocks = [X[a:b] @ X[a:b].T for a, b in zip(offsets[:-1], offsets[1:])]
+    S = sparse.block_diag(blocks, format='csr') if blocks else sparse.csr_matrix((0, 0))
+    S.setdiag(0)
+    S.eliminate_zeros()
+    return S
+
+def textrank(S, offsets: np.ndarray, damping: float = DAMPING, iters: int = 50, tol: float = 1e-6) -> np.ndarray:
+    """배치 전체를 한 번의 power iteration으로 계산 (문서별 블록이라 서로 섞이지 않음)"""
+    from scipy import sparse
+
+    sizes = np.diff(offsets)
+    tele = np.repeat(1.0 / np.maximum(sizes, 1), sizes)
+
+    out = np.asarray(S.sum(axis=1)).ravel()
+    out[out == 0] = 1.0
+    P = (sparse.diags(1.0 / out) @ S).T.tocsr()
+
+    r = tele.copy()
+    for _ in range(iters):
+        nxt = (1 - damping) * tele + damping * (P @ r)
+        if np.abs(nxt - r).max(initial=0.0) < tol:
+            r = nxt
+            break
+        r = nxt
+    return r
+
+def scores(docs: List[List[str]], method: str = 'textrank') -> Tuple[np.ndarray, np.ndarray]:
+    """
+    문장 점수 = 문서 내 최댓값으로 정규화한 TextRank(또는 연결 중심성)
+              + 길이(10~30단어) / 앞부분(30%) 가산점
+    반환: (배치 전체 문장 점수, 문서별 시작 offset)
+    """
+    X, offsets = sentence_matrix(docs)
+    n = X.shape[0]
+    if n == 0:
+        return np.zeros(0), offsets
+
+    S = similarity(X, offsets)
+    if method == 'textrank':
+        rank = textrank(S, offsets)
+    else:
+        rank = np.asarray(S.sum(axis=1)).ravel()
+
+    sizes = np.diff(offsets)
+    nonempty = sizes > 0
+    doc_of = np.repeat(np.arange(len(docs)), sizes)
+    peak = np.zeros(len(docs))
+    peak[nonempty] = np.maximum.reduceat(rank, offsets[:-1][nonempty])
+    peak[peak == 0] = 1.0
+    rank = rank / peak[doc_of]
+
+    lengths = np.fromiter((len(s.split()) for sents in docs for s in sents), dtype=np.int32, count=n)
+    pos = np.arange(n) - offsets[:-1][doc_of]
+    bonus = 0.3 * ((lengths >= 10) & (lengths <= 30)) + 0.2 * (pos < sizes[doc_of] * 0.3)
+    return rank + bonus, offsets
+
+def summarize_batch(texts: List[str], max: int = 3, method: str = 'textrank') -> List[str]:
+    """여러 문서를 한 번에 요약 (문서별 상위 max개 문장을 원래 순서대로)"""
+    docs = [sentences(t or '') for t in texts]
+    sc, offsets = scores(docs, method)
+
+    res = []
+    for t, sents, a, b in zip(texts, docs, offsets[:-1], offsets[1:]):
+        if len(sents) <= max:
+            res.append(t or '')
+            continue
+        top = np.argpartition(-sc[a:b], max - 1)[:max]
+        res.append('. '.join(sents[i] for i in np.sort(top)))
+    return res
+
+def summarize(text: str, max: int = 3, method: str = 'textrank') -> str:
+    return summarize_batch([text], max, method)[0]
@@ -25,8 +25,9 @@ def run_test(test_query: str):
         # --- STEP 1: 질문 의도 분석 (키워드 및 분야 추출) ---
         print("--- STEP 1: 질문 의도 분석 중... ---")
         intent_analyzer = Intent()
-        keywords = intent_analyzer.Key(test_query)
-        domains = intent_analyzer.Domain(test_query)
+        analysis = intent_analyzer.analyze(test_query)
+        keywords = analysis['keywords']
+        domains = analysis['domains']
         
         if not keywords:
             print("❌ 질문에서 키워드를 추출할 수 없습니다. 테스트를 중단합니다.")
@@ -38,7 +39,7 @@ def run_test(test_query: str):
         # --- STEP 2: 스마트 검색 (분야에 맞춰 최적의 사이트 검색) ---
         print("--- STEP 2: 스마트 검색 실행 중... ---")
         search_engine = Search()
-        search_results = search_engine.search_all(keywords)
+        search_results = search_engine.search_all(keywords, query=analysis['query'])
         
         if not search_results:
             print("❌ 검색된 문헌이 없습니다. 테스트를 중단합니다.")
@@ -50,7 +51,7 @@ def run_test(test_query: str):
         # --- STEP 3: 콘텐츠 다운로드 및 추출 ---
         print("--- STEP 3: 문헌 콘텐츠 추출 중... ---")
         downloader = Download()
-        downloaded_papers = [p for p in (downloader.d_and_p(paper) for paper in search_results) if p]
+        downloaded_papers = [p for p in downloader.d_and_p_many(search_results) if p]
         
         if not downloaded_papers:
             print("❌ 문헌은 찾았지만 내용을 추출할 수 없었습니다. 테스트를 중단합니다.")
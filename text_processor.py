@@ -1,17 +1,51 @@
 import logging, re
+import numpy as np
 from typing import List, Dict, Optional
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
 from collections import Counter
+from config import Config
+from sparse_index import SparseIndex
+from embedding_store import EmbeddingStore
+from retrieval import BM25Index, dense_search, rrf
+import summarizer
+from paper import Paper
+import metrics
 
 logger = logging.getLogger(__name__)
 
 class tProcessor:
-    def __init__(self):
-        self.a_vec = TfidfVectorizer(max_features=1000, stop_words='english')
-        self.doc_vec = None
+    def __init__(self, index: Optional[SparseIndex] = None, use_embed: bool = None, embed_store: Optional[EmbeddingStore] = None,
+                 passage_index: Optional[SparseIndex] = None, use_passages: bool = None, mode: str = None):
+        self.index = index if index is not None else SparseIndex.load()
+        self.ind_map = {}
         self.processed_doc = {}
 
+        self.use_passages = Config.USE_PASSAGES if use_passages is None else use_passages
+        self.passage_index = passage_index
+        if self.use_passages and passage_index is None:
+            self.passage_index = SparseIndex.load(Config.PASSAGE_INDEX_DIR)
+        self.passages = {}
+
+        self.mode = mode or Config.RETRIEVAL_MODE
+        self.bm25 = BM25Index()
+        self.doc_emb = None
+        self.emb_ids = []
+
+        self.use_embed = Config.USE_EMBEDDINGS if use_embed is None else use_embed
+        self.embedding = None
+        self.embed_store = embed_store
+        self.embed_failed = False
+
+    def fork(self) -> 'tProcessor':
+        """
+        인덱스 / 임베딩 모델 / 캐시는 공유하고 배치 상태(ind_map 등)만 새로 가진 인스턴스
+        (동시 요청마다 하나씩 사용)
+        """
+        t = tProcessor(index=self.index, use_embed=self.use_embed, embed_store=self.embed_store,
+                       passage_index=self.passage_index, use_passages=self.use_passages, mode=self.mode)
+        t.embedding = self.embedding
+        t.embed_failed = self.embed_failed
+        return t
+
     def ensure_data(self):
         """NLTK 데이터 확인 및 다운로드"""
         try:
@@ -27,36 +61,205 @@ class tProcessor:
         except ImportError:
             logger.warning("NLTK 설치되지 않음 => 기본 텍스트 처리만 사용")
 
-    def _init_embed(self):
+    def _init_embed(self) -> bool:
+        """임베딩 모델 / 캐시 지연 로드 (실패 시 다시 시도하지 않음)"""
+        if self.embedding is not None: return True
+        if not self.use_embed or self.embed_failed: return False
+
         try:
             from sentence_transformers import SentenceTransformer
-            from config import Config
 
-            self.embedding = SentenceTransformer(Config.EMBEDDING_MODEL)
+            self.embedding = SentenceTransformer(Config.EMBEDDING_MODEL, device='cpu')
+            if self.embed_store is None:
+                self.embed_store = EmbeddingStore()
             logging.info(f"임베딩 모델 로드 완료: {Config.EMBEDDING_MODEL}")
+            return True
 
         except ImportError:
             logger.info("sentence-transformers 미설치 - TF-IDF만 사용")
         except Exception as e:
             logger.warning(f"임베딩 모델 로드 실패 : {e}")
 
-    def process_doc(self, ps: List[Dict]) -> List[Dict]:
-        """논문 일괄 처리"""
+        self.embed_failed = True
+        return False
+
+    def embed(self, texts: List[str]) -> Optional[np.ndarray]:
+        """
+        텍스트 배치 임베딩 (정규화된 float32 행렬)
+        캐시에 있는 텍스트는 다시 인코딩하지 않음
+        """
+        if not texts or not self._init_embed(): return None
+
+        texts = [t[:Config.EMBED_MAX_CHARS] for t in texts]
+        hashes = [EmbeddingStore.text_hash(t) for t in texts]
+        model = Config.EMBEDDING_MODEL
+
+        vecs = self.embed_store.get_many(model, hashes)
+        miss = {h: t for h, t in zip(hashes, texts) if h not in vecs}
+
+        if miss:
+            try:
+                enc = self.embedding.encode(
+                    list(miss.values()),
+                    batch_size=Config.EMBED_BATCH_SIZE,
+                    convert_to_numpy=True,
+                    normalize_embeddings=True,
+                    show_progress_bar=False
+                ).astype(np.float32)
+            except Exception as e:
+                logger.warning(f"임베딩 생성 실패: {e}")
+                return None
+
+            new = dict(zip(miss, enc))
+            self.embed_store.put_many(model, new)
+            vecs.update(new)
+
+        metrics.cache('embedding', True, len(texts) - len(miss))
+        metrics.cache('embedding', False, len(miss))
+        logger.info(f"임베딩 {len(texts)}건 (캐시 {len(texts) - len(miss)}건, 신규 {len(miss)}건)")
+        return np.stack([vecs[h] for h in hashes])
+
+    def embed_docs(self, ps: List[Dict]):
+        """논문 리스트에 'embedding' 추가 (한 번의 배치 인코딩)"""
+        ps = [p for p in ps if p.get('clean_text')]
+        vecs = self.embed([p['clean_text'] for p in ps])
+        if vecs is None: return
+
+        for p, v in zip(ps, vecs):
+            p['embedding'] = v
+
+    def process_doc(self, ps: List[Dict], save: bool = True) -> List[Dict]:
+        """논문 일괄 처리 (누적 TF-IDF 인덱스에 추가)"""
         self.ind_map = {}
-        corpus = []
-        
+        self.passages = {}
+
         for p in ps:
-            full_text = p.get('full_text') or p.get('abstract', '')
-            if full_text and len(full_text.strip()) > 50:
-                clean_text = re.sub(r'\s+', ' ', full_text).strip()
-                p['clean_text'] = clean_text
-                corpus.append(clean_text)
-                self.ind_map[len(corpus) -1] = p
-        if corpus:
-            self.doc_vec = self.a_vec.fit_transform(corpus)
-        
+            clean_text = self.prepare(p)
+            if clean_text:
+                p_id = str(p.get('id', len(self.ind_map)))
+                self.ind_map[p_id] = p
+                self.index.add(p_id, clean_text, self.index_meta(p))
+                if self.use_passages:
+                    self.index_passages(p_id, clean_text)
+
+        # score_doc으로 이미 추가된 문서도 저장되도록 이번 호출의 추가 수가 아니라 미저장 여부로 판단
+        if save and (self.index.dirty or (self.passage_index is not None and self.passage_index.dirty)):
+            self.save_index()
+
+        if self.mode in ('bm25', 'hybrid'):
+            self.bm25 = BM25Index().build(list(self.ind_map), [p['clean_text'] for p in self.ind_map.values()])
+
+        self.doc_emb, self.emb_ids = None, []
+        if self.use_embed and self.mode in ('dense', 'hybrid'):
+            self.embed_docs(list(self.ind_map.values()))
+            embedded = [(p_id, p['embedding']) for p_id, p in self.ind_map.items() if p.get('embedding') is not None]
+            if embedded:
+                self.emb_ids = [p_id for p_id, _ in embedded]
+                self.doc_emb = np.stack([v for _, v in embedded])
+
         return ps
 
+    def prepare(self, p: Dict) -> Optional[str]:
+        """본문(없으면 초록) 공백 정리 후 'clean_text'로 저장"""
+        full_text = p.get('full_text') or p.get('abstract', '')
+        if not full_text or len(full_text.strip()) <= 50:
+            return None
+
+        clean_text = re.sub(r'\s+', ' ', full_text).strip()
+        p['clean_text'] = clean_text
+        return clean_text
+
+    def score_doc(self, q: str, p: Dict) -> Optional[float]:
+        """
+        논문 1편을 정제해 누적 인덱스에 추가하고 질문과의 관련도 반환
+        (다운로드되는 대로 채점하는 파이프라인용, 텍스트가 없으면 None)
+        """
+        clean_text = self.prepare(p)
+        if not clean_text: return None
+
+        p_id = str(p.get('id'))
+        self.index.add(p_id, clean_text, self.index_meta(p))
+        hits = self.index.search(q, 1, ids=[p_id])
+        return hits[0][1] if hits else 0.0
+
+    def index_meta(self, p: Dict) -> Dict:
+        return {k: p.get(k) for k in ('title', 'source', 'web_url', 'pdf_url')}
+
+    def save_index(self):
+        try:
+            self.index.save()
+            if self.passage_index is not None:
+                self.passage_index.save()
+        except Exception as e:
+            logger.warning(f"TF-IDF 인덱스 저장 실패: {e}")
+
+    def chunk(self, text: str, size: int = None, overlap: int = None) -> List[tuple]:
+        """
+        텍스트를 겹치는 문단으로 분할 -> [(시작, 끝)]
+        경계는 가능하면 문장 끝 / 공백에 맞춤
+        """
+        size = size or Config.CHUNK_CHARS
+        overlap = Config.CHUNK_OVERLAP if overlap is None else overlap
+        n = len(text)
+        spans, start = [], 0
+
+        while start < n:
+            end = min(start + size, n)
+            if end < n:
+                cut = text.rfind('. ', start + size // 2, end)
+                if cut < 0:
+                    cut = text.rfind(' ', start + size // 2, end)
+                if cut > 0:
+                    end = cut + 1
+
+            spans.append((start, end))
+            if end >= n: break
+
+            nxt = max(end - overlap, start + 1)
+            sp = text.find(' ', nxt, end)
+            start = sp + 1 if sp >= 0 else nxt
+
+        return spans
+
+    def index_passages(self, p_id: str, text: str) -> int:
+        """논문을 문단으로 나눠 문단 인덱스에 추가 (바뀐 문단 수 반환)"""
+        added = 0
+        spans = self.chunk(text)
+
+        for i, (s, e) in enumerate(spans):
+            pid = f"{p_id}#{i}"
+            added += self.passage_index.add(pid, text[s:e], {'doc_id': p_id, 'start': s, 'end': e})
+            self.passages[pid] = (p_id, s, e)
+
+        # 이전보다 문단 수가 줄었으면 남은 문단 삭제
+        i = len(spans)
+        while self.passage_index.remove(f"{p_id}#{i}"):
+            i += 1
+            added += 1
+
+        return added
+
+    def rel_passages(self, q: str, top_k: int = None) -> List[Dict]:
+        """이번에 처리한 논문의 문단 중 질문과 관련성 높은 문단"""
+        if not self.passages: return []
+        top_k = top_k or Config.PASSAGE_TOP_K
+
+        res = []
+        for pid, score in self.passage_index.search(q, top_k, ids=list(self.passages)):
+            if score > 0:
+                res.append(self.passage(pid, score))
+        return res
+
+    def passage(self, pid: str, score: float) -> Dict:
+        p_id, s, e = self.passages[pid]
+        return {
+            'doc_id': p_id,
+            'start': s,
+            'end': e,
+            'text': self.ind_map[p_id]['clean_text'][s:e],
+            'score': score
+        }
+
     def single_doc(self, p: Dict) -> Optional[Dict]:
         """단일 논문 처리"""
         id = p.get('id', 'unknown')
@@ -83,28 +286,26 @@ class tProcessor:
         summary = self.gen_sum(c_text, max = 3)
 
         emb = None
-        if self.embedding:
-            try:
-                emb = self.embedding.encode(c_text[:2000])
-            except Exception as e :
-                logger.warning(f"임베딩 생성 실패 {id}: {e}")
+        vecs = self.embed([c_text])
+        if vecs is not None:
+            emb = vecs[0]
         
-        processed_p = {
-            'id': id,
-            'title': p.get('title', ''),
-            'authors': p.get('authors', []),
-            'source' : p.get('source', ''),
-            'year': p.get('year', ''),
-            'original_text': main_text,
-            'clean_text': c_text,
-            'text_type': text_type,
-            'keywords': keys,
-            'summary': summary,
-            'embedding': emb.tolist() if emb is not None else None,
-            'text_stats': self.cal_text(c_text),
-            'web_url': p.get('web_url'),
-            'pdf_url': p.get('pdf_url')
-        }
+        # 원문은 따로 보관하지 않고 정제본 하나만 유지
+        processed_p = Paper(
+            id=id,
+            title=p.get('title', ''),
+            authors=p.get('authors', []),
+            source=p.get('source', ''),
+            year=p.get('year', ''),
+            text_type=text_type,
+            keywords=keys,
+            summary=summary,
+            embedding=emb,
+            text_stats=self.cal_text(c_text),
+            web_url=p.get('web_url'),
+            pdf_url=p.get('pdf_url')
+        )
+        processed_p['clean_text'] = c_text
         
         self.processed_doc[id] = processed_p
         return processed_p
@@ -130,32 +331,11 @@ class tProcessor:
 
     def gen_sum(self, text: str, max:int = 3) -> str:
         """텍스트 요약"""
-        sentence = text.split('. ')
-
-        if len(sentence) <= max:
-            return text
-        
-        scores = []
-
-        for i, s in enumerate(sentence):
-            score = 0
-
-            length = len(s.split())
-            if 10 <= length <= 30:
-                score += 1
-
-            if i < len(sentence) * 0.3:
-                score += 0.5
+        return self.gen_sum_batch([text], max)[0]
 
-            key = self.Ex_keys(s, max = 5)
-            score += len(key) * 0.2
-
-            scores.append((i, score, s))
-
-            sel_s = sorted(scores[:max], key = lambda x: x[0])
-
-        sum_text = '. '.join([s[2] for s in sel_s])
-        return sum_text
+    def gen_sum_batch(self, texts: List[str], max: int = 3) -> List[str]:
+        """여러 텍스트를 한 번에 요약 (배치 단위 문장-단어 행렬 + TextRank)"""
+        return summarizer.summarize_batch(texts, max)
     
     def cal_text(self, text:str) -> Dict:
         """텍스트 계산"""
@@ -170,42 +350,9 @@ class tProcessor:
             'avg_chars_per_word': len(text) / max(len(w), 1)
         }
     
-    def build_vec(self, text: List[str]):
-        try:
-            self.a_vec = TfidfVectorizer(
-                max_features=1000,
-                stop_words='english',
-                ngram_range=(1,2),
-                min_df=2,
-                max_df=0.8
-            )
-
-            self.doc_vec = self.a_vec.fit_transform(text)
-            logger.info(f"TF-IDF 벡터 구축 완료: {self.doc_vec.shape}")
-
-        except Exception as e:
-            logger.error(f"TF-IDF 벡터 구축 실패: {e}")
-
     def Ex_keys(self, text: str, max :int = 10) -> List[str]:
         """키워드 추출"""
-        try:
-            from nltk.corpus import stopwords
-            from nltk.tokenize import word_tokenize
-
-            stop_w = set(stopwords.words('english'))
-
-            academic = {
-                'paper', 'study', 'research', 'analysis', 'method', 'result', 
-                'conclusion', 'abstract', 'introduction', 'discussion'
-            }
-            stop_w.update(academic)
-
-        except ImportError:
-            stop_w = {
-                'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 
-                'of', 'with', 'by', 'is', 'are', 'was', 'were', 'be', 'been', 'have', 
-                'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could', 'should'
-            }
+        stop_w = summarizer.stop_words()
 
         words = re.findall(r'\b[a-zA-Z]{3,}\b', text.lower())
         filter_word = [w for w in words if w not in stop_w and len(w) > 2]
@@ -216,23 +363,117 @@ class tProcessor:
 
         return top_key
     
-    def rel_doc(self, q: str, top_k: int = 5) -> List[Dict]:
-        """질문에 가장 관련성 높은 논문 찾기"""
-        if self.doc_vec is None:
-            return list(self.ind_map.values())[:top_k]
-        
-        q_vec = self.a_vec.transform([q])
-        sim = cosine_similarity(q_vec, self.doc_vec).flatten()
-
-        top_in = sim.argsort()[::-1][:top_k]
+    def rel_doc(self, q: str, top_k: int = 5, scope: str = 'batch', mode: str = None) -> List[Dict]:
+        """
+        질문에 가장 관련성 높은 논문 찾기
+        scope='batch': 이번에 처리한 논문 중에서, 'all': 누적 인덱스 전체에서
+        mode: 'tfidf' | 'bm25' | 'dense' | 'hybrid' (기본값 Config.RETRIEVAL_MODE)
+        문단 검색 사용 시 각 논문에 관련 문단('passages')을 붙여서 반환
+        """
+        mode = mode or self.mode
+        if scope == 'batch' and mode != 'tfidf':
+            rel_docs = self.rel_doc_hybrid(q, top_k, mode)
+            if rel_docs:
+                return rel_docs
+
+        if self.use_passages and scope == 'batch':
+            rel_docs = self.rel_doc_passages(q, top_k)
+            if rel_docs:
+                return rel_docs
+
+        ids = list(self.ind_map) if scope == 'batch' else None
+        if ids is not None and not ids:
+            return []
+
+        hits = self.index.search(q, top_k, ids=ids)
 
         rel_docs = []
-        for i in top_in:
-            doc = self.ind_map.get(i)
-            if doc:
-                doc['relevance_score'] = sim[i]
-                rel_docs.append(doc)
+        for p_id, score in hits:
+            doc = self.ind_map.get(p_id) or dict(self.index.meta.get(p_id, {}), id=p_id)
+            doc['relevance_score'] = score
+            doc.pop('passages', None)
+            rel_docs.append(doc)
 
         if rel_docs:
             logger.info(f"상위 {len(rel_docs)}개 문헌 필터링 완료 (최고 점수: {rel_docs[0].get('relevance_score', 0):.4f})")
         return rel_docs
+
+    def rel_doc_passages(self, q: str, top_k: int = 5) -> List[Dict]:
+        """
+        상위 문단을 논문별로 묶어, 최고 문단 점수 순으로 논문 반환
+        몇 편의 논문이 상위 문단을 독차지하면 top_k편이 모일 때까지 문단을 더 가져옴
+        반환 문서는 얕은 복사본 (ind_map의 공유 레코드에 점수 / 문단을 쓰지 않음)
+        """
+        n = max(Config.PASSAGE_TOP_K, top_k * Config.PASSAGES_PER_DOC)
+        while True:
+            hits = self.rel_passages(q, n)
+            grouped: Dict[str, List[Dict]] = {}
+            for ps in hits:
+                grouped.setdefault(ps['doc_id'], []).append(ps)
+            if len(grouped) >= top_k or len(hits) < n or n >= len(self.passages):
+                break
+            n *= 2
+
+        rel_docs = []
+        for p_id, ps in list(grouped.items())[:top_k]:
+            doc = self.ind_map[p_id].copy()
+            ps = ps[:Config.PASSAGES_PER_DOC]
+            doc['relevance_score'] = ps[0]['score']
+            doc['passages'] = sorted(ps, key=lambda x: x['start'])
+            rel_docs.append(doc)
+
+        if rel_docs:
+            n = sum(len(d['passages']) for d in rel_docs)
+            logger.info(f"상위 {n}개 문단 ({len(rel_docs)}개 문헌) 선택 완료 (최고 점수: {rel_docs[0]['relevance_score']:.4f})")
+        return rel_docs
+
+    def rel_doc_hybrid(self, q: str, top_k: int = 5, mode: str = 'hybrid') -> List[Dict]:
+        """BM25 / 임베딩 검색 결과를 Reciprocal Rank Fusion으로 결합"""
+        n = Config.HYBRID_CANDIDATES
+        legs, scores = [], {}
+
+        if mode in ('bm25', 'hybrid') and len(self.bm25):
+            hits = self.bm25.search(q, n)
+            legs.append([d for d, _ in hits])
+            scores['bm25_score'] = dict(hits)
+
+        if mode in ('dense', 'hybrid') and self.doc_emb is not None:
+            q_vec = self.embed([q])
+            if q_vec is not None:
+                hits = dense_search(self.doc_emb, self.emb_ids, q_vec[0], n)
+                legs.append([d for d, _ in hits])
+                scores['dense_score'] = dict(hits)
+
+        fused = rrf(l for l in legs if l)[:top_k]
+        if not fused: return []
+
+        rel_docs = []
+        for p_id, score in fused:
+            doc = self.ind_map[p_id]
+            doc['relevance_score'] = score
+            for name, s in scores.items():
+                doc[name] = s.get(p_id)
+            doc.pop('passages', None)
+            rel_docs.append(doc)
+
+        if self.use_passages:
+            self.attach_passages(q, rel_docs)
+
+        logger.info(f"{mode} 검색으로 상위 {len(rel_docs)}개 문헌 선택 (최고 점수: {rel_docs[0]['relevance_score']:.4f})")
+        return rel_docs
+
+    def attach_passages(self, q: str, docs: List[Dict]):
+        """선택된 논문마다 질문과 관련된 문단을 붙임 (일치하는 문단이 없으면 생략)"""
+        selected = {id(d) for d in docs}
+        ids = {p_id for p_id, p in self.ind_map.items() if id(p) in selected}
+        pids = [pid for pid, (p_id, _, _) in self.passages.items() if p_id in ids]
+        if not pids: return
+
+        grouped: Dict[str, List[Dict]] = {}
+        for pid, score in self.passage_index.search(q, len(ids) * Config.PASSAGES_PER_DOC * 2, ids=pids):
+            if score > 0:
+                ps = self.passage(pid, score)
+                grouped.setdefault(ps['doc_id'], []).append(ps)
+
+        for p_id, ps in grouped.items():
+            self.ind_map[p_id]['passages'] = sorted(ps[:Config.PASSAGES_PER_DOC], key=lambda x: x['start'])